@@ -1,8 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.models import Group
-from django.utils.safestring import mark_safe
+from django.utils.html import format_html
 
+from .images import image_storage, smallest_variant, srcset
 from .models import Category, Location, Post, Comment
+from .search import search_posts
 
 
 class PostInline(admin.StackedInline):
@@ -58,12 +60,26 @@ class PostAdmin(admin.ModelAdmin):
 
     readonly_fields = ["photo"]
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
     def photo(self, obj):
-        if obj.image:
-            return mark_safe(
-                f'<img src={obj.image.url} width="80" height="60">'
+        if not obj.image:
+            return 'Без фото'
+        variant = smallest_variant(obj.image_variants)
+        if variant is None:
+            return format_html(
+                '<img src="{}" width="80" loading="lazy">', obj.image.url
             )
-        return 'Без фото'
+        return format_html(
+            '<img src="{}" srcset="{}" sizes="80px" width="80" height="{}"'
+            ' loading="lazy">',
+            image_storage.url(variant['name']),
+            srcset(obj.image_variants, 'jpeg'),
+            round(80 * variant['height'] / variant['width']),
+        )
 
 
 @admin.register(Comment)
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.shortcuts import aget_object_or_404
+
+from .lookups import aattach_category_location, categories_by_slug
+from .mixins import AsyncListMixin, prime_memo
+from .views import (
+    CategoryListView, IndexListView, PostDetailView, ProfileListView
+)
+
+
+class AsyncIndexListView(AsyncListMixin, IndexListView):
+    pass
+
+
+class AsyncProfileListView(AsyncListMixin, ProfileListView):
+
+    async def prepare(self):
+        prime_memo(self, 'get_profile', await aget_object_or_404(
+            User, username=self.kwargs['username']
+        ))
+
+
+class AsyncCategoryListView(AsyncListMixin, CategoryListView):
+
+    async def prepare(self):
+        prime_memo(self, 'get_category', self.check_published(
+            await categories_by_slug.aget(self.kwargs['category_slug'])
+        ))
+
+
+class AsyncPostDetailView(AsyncListMixin, PostDetailView):
+
+    async def prepare(self):
+        post = await aget_object_or_404(
+            self.get_post_queryset(), pk=self.kwargs['post_id']
+        )
+        await aattach_category_location((post,))
+        prime_memo(self, 'get_object', self.check_visible(post))
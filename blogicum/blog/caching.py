@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import FEED_CACHE_BUCKET
+
+VERSION_KEY = 'blog:version:{}'
+
+
+def get_versions(*tags):
+    """Текущие версии тегов; отсутствующие в кэше создаются заново."""
+    keys = {tag: VERSION_KEY.format(tag) for tag in tags}
+    versions = cache.get_many(keys.values())
+    for tag, key in keys.items():
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return tuple(versions[keys[tag]] for tag in tags)
+
+
+async def aget_versions(*tags):
+    """Асинхронный вариант get_versions()."""
+    keys = {tag: VERSION_KEY.format(tag) for tag in tags}
+    versions = await cache.aget_many(keys.values())
+    for tag, key in keys.items():
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), None)
+            versions[key] = await cache.aget(key)
+    return tuple(versions[keys[tag]] for tag in tags)
+
+
+def set_new_versions(tags):
+    cache.set_many(
+        {VERSION_KEY.format(tag): time.time_ns() for tag in tags}, None
+    )
+
+
+def bump(*tags):
+    """Делает устаревшими все ключи, построенные на версиях тегов.
+
+    Версии меняются сразу и ещё раз после фиксации транзакции, чтобы
+    параллельный запрос не закэшировал старые данные под новой версией.
+    """
+    tags = set(tags)
+    set_new_versions(tags)
+    transaction.on_commit(lambda: set_new_versions(tags))
+
+
+def feed_tags(posts):
+    """Теги всех лент и страниц, на которых показаны публикации posts."""
+    tags = {'posts'}
+    for pk, slug, username in posts.order_by().values_list(
+        'pk', 'category__slug', 'author__username'
+    ):
+        tags |= {f'post:{pk}', f'category:{slug}', f'author:{username}'}
+    return tags
+
+
+def make_key(prefix, tags, *parts):
+    versions = '.'.join(map(str, get_versions(*tags)))
+    return ':'.join(map(str, ('blog', prefix, *tags, versions, *parts)))
+
+
+def feed_cache_bucket():
+    """Сколько секунд лента может отдаваться из кэша результатов."""
+    return getattr(settings, 'BLOG_FEED_CACHE_BUCKET', FEED_CACHE_BUCKET)
+
+
+def time_bucket(seconds):
+    """Номер интервала времени длиной seconds, в который попадает «сейчас»."""
+    return int(time.time() // seconds)
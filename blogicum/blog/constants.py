@@ -1,3 +1,16 @@
 TITLE_LENGTH = 256
 POSTS_LIMIT = 10
 SHORT_TITLE_LEN = 20
+FEED_COUNT_TIMEOUT = 60 * 5
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+EXCERPT_WORDS = 10
+SCHEDULER_POLL_INTERVAL = 60
+FEED_CACHE_BUCKET = 30
+PAGE_CACHE_TIMEOUT = 60 * 10
+LOOKUP_CACHE_SIZE = 256
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_QUALITY = 80
+MEDIA_CACHE_TIMEOUT = 60 * 60 * 24 * 365
+MEDIA_GC_GRACE = 60 * 60 * 24
@@ -0,0 +1,109 @@
+import re
+
+CLASS_ATTR_RE = re.compile(r'class\s*=\s*"([^"]*)"|class\s*=\s*\'([^\']*)\'')
+TEMPLATE_TAG_RE = re.compile(r'{%.*?%}|{{.*?}}', re.DOTALL)
+CLASS_NAME_RE = re.compile(r'^-?[_a-zA-Z][\w-]*$')
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+NOT_RE = re.compile(r':not\([^)]*\)')
+COMMENT_RE = re.compile(r'/\*[\s\S]*?\*/')
+LICENSE_RE = re.compile(r'/\*![\s\S]*?\*/')
+TOKEN_RE = re.compile(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[{};]''')
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+def find_classes(html):
+    """Имена классов из атрибутов class разметки или шаблона Django."""
+    classes = set()
+    for double, single in CLASS_ATTR_RE.findall(html):
+        value = TEMPLATE_TAG_RE.sub(' ', double or single)
+        classes.update(
+            name for name in value.split() if CLASS_NAME_RE.match(name)
+        )
+    return classes
+
+
+def split_rules(css):
+    """Правила верхнего уровня: пары (заголовок, тело).
+
+    Для правил без блока (@charset, @import) тело — None.
+    """
+    rules = []
+    depth = start = body_start = 0
+    prelude = None
+    for token in TOKEN_RE.finditer(css):
+        char = token[0]
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:token.start()].strip()
+                body_start = token.end()
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[body_start:token.start()]))
+                start = token.end()
+        elif char == ';' and depth == 0:
+            rules.append((css[start:token.start()].strip(), None))
+            start = token.end()
+    return rules
+
+
+def split_selectors(prelude):
+    """Селекторы списка через запятую; запятые в скобках не разделяют."""
+    selectors = []
+    depth = start = 0
+    for index, char in enumerate(prelude):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index].strip())
+            start = index + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def selector_is_used(selector, classes):
+    return all(
+        name in classes
+        for name in SELECTOR_CLASS_RE.findall(NOT_RE.sub('', selector))
+    )
+
+
+def purge_rules(rules, classes):
+    output = []
+    for prelude, body in rules:
+        if body is None:
+            output.append(f'{prelude};')
+        elif prelude.startswith(NESTED_AT_RULES):
+            inner = purge_rules(split_rules(body), classes)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if selector_is_used(selector, classes)
+            ]
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(output)
+
+
+def purge_css(css, classes, inline=False):
+    """Таблица стилей без правил, в которых есть неиспользуемые классы.
+
+    Правила без классов (сброс стилей, переменные :root) сохраняются.
+    Для встраивания в <style> (inline) отбрасываются @charset и лицензия.
+    """
+    rules = split_rules(COMMENT_RE.sub('', css))
+    charset = [rule for rule in rules if rule[0].startswith('@charset')]
+    rules = [rule for rule in rules if rule not in charset]
+    if inline:
+        return purge_rules(rules, classes)
+    return (
+        purge_rules(charset, classes) + ''.join(LICENSE_RE.findall(css))
+        + purge_rules(rules, classes)
+    )
@@ -0,0 +1,200 @@
+import posixpath
+from datetime import timedelta
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .caching import bump, feed_tags
+from .constants import (
+    IMAGE_QUALITY, IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_WIDTHS
+)
+from .models import Post
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+image_storage = Post.image.field.storage
+UPLOAD_DIR = PurePosixPath(Post.image.field.upload_to)
+VARIANTS_DIR = UPLOAD_DIR / 'variants'
+
+
+def variant_widths(width):
+    """Ширины вариантов, меньшие исходной, и сама исходная, если она не
+    превышает наибольшую."""
+    widths = [size for size in IMAGE_VARIANT_WIDTHS if size < width]
+    if width <= IMAGE_VARIANT_WIDTHS[-1]:
+        widths.append(width)
+    return widths
+
+
+def flatten(image):
+    """Изображение в RGB; прозрачный фон заменяется белым."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def encode(image, image_format):
+    buffer = BytesIO()
+    image.save(
+        buffer, image_format.upper(), quality=IMAGE_QUALITY, optimize=True
+    )
+    return buffer.getvalue()
+
+
+def strip_metadata(name, storage=image_storage):
+    """Имя копии изображения name без EXIF (в том числе координат съёмки).
+
+    Изображение поворачивается по ориентации из EXIF, кодируется заново и
+    сохраняется под новым именем; если метаданных нет или это не
+    изображение, возвращается само name.
+    """
+    try:
+        with storage.open(name) as file, Image.open(file) as source:
+            if not source.getexif():
+                return name
+            image_format = source.format
+            image = ImageOps.exif_transpose(source)
+            buffer = BytesIO()
+            image.save(buffer, image_format, quality=95)
+    except OSError:
+        return name
+    return storage.save(
+        str(UPLOAD_DIR / PurePosixPath(name).name),
+        ContentFile(buffer.getvalue()),
+    )
+
+
+def make_variants(name, storage=image_storage):
+    """Создаёт уменьшенные копии изображения name во всех форматах.
+
+    Возвращает описание для Post.image_variants: размеры исходника и список
+    вариантов с именами файлов в storage.
+    """
+    with storage.open(name) as file, Image.open(file) as source:
+        image = flatten(ImageOps.exif_transpose(source))
+    path = PurePosixPath(name)
+    variants = []
+    for width in variant_widths(image.width):
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for image_format in IMAGE_VARIANT_FORMATS:
+            variant_name = storage.save(
+                str(VARIANTS_DIR
+                    / f'{path.stem}_{width}w.{EXTENSIONS[image_format]}'),
+                ContentFile(encode(resized, image_format)),
+            )
+            variants.append({
+                'name': variant_name,
+                'width': width,
+                'height': height,
+                'format': image_format,
+            })
+    return {
+        'source': name,
+        'width': image.width,
+        'height': image.height,
+        'variants': variants,
+    }
+
+
+def referenced_files():
+    """Имена исходников и вариантов, на которые ссылаются публикации."""
+    names = set()
+    for image, image_variants in Post.objects.exclude(
+        image=''
+    ).values_list('image', 'image_variants').iterator():
+        names.add(image)
+        names.update(
+            variant['name']
+            for variant in image_variants.get('variants', ())
+        )
+    return names
+
+
+def stored_files(storage, directory):
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from stored_files(storage, posixpath.join(directory, name))
+
+
+def collect_garbage(grace, storage=image_storage):
+    """Удаляет файлы изображений, на которые не ссылается ни одна публикация
+    и которые не менялись дольше grace секунд.
+
+    Ссылки читаются до обхода файлов: если загрузка переиспользует файл
+    позже, хранилище обновит время его изменения, и файл останется. Заодно
+    удаляются временные файлы загрузок, брошенные упавшим процессом.
+    """
+    referenced = referenced_files()
+    deadline = timezone.now() - timedelta(seconds=grace)
+    deleted = []
+    for name in stored_files(storage, Post.image.field.upload_to):
+        if name in referenced:
+            continue
+        if storage.get_modified_time(name) < deadline:
+            storage.delete(name)
+            deleted.append(name)
+    return deleted
+
+
+def needs_variants(post):
+    """Изображение сменилось, а варианты ещё не пересозданы."""
+    if not post.image:
+        return bool(post.image_variants)
+    return post.image_variants.get('source') != post.image.name
+
+
+def update_post_variants(post):
+    """Обрабатывает изображение публикации, если оно сменилось: удаляет
+    EXIF и пересоздаёт варианты.
+
+    Результат записывается, только если в базе у публикации всё то же
+    изображение: автор мог заменить его, пока шла обработка. Файлы, на
+    которые больше никто не ссылается, удаляет collect_garbage().
+    """
+    if not needs_variants(post):
+        return False
+    name = post.image.name
+    image_name = strip_metadata(name) if post.image else name
+    image_variants = make_variants(image_name) if post.image else {}
+    posts = Post.objects.filter(pk=post.pk, image=name)
+    if not posts.update(image=image_name, image_variants=image_variants):
+        return False
+    post.image.name = image_name
+    post.image_variants = image_variants
+    posts = Post.objects.filter(pk=post.pk)
+    bump(*feed_tags(posts))
+    return True
+
+
+def process_post_image(post_id):
+    """Задача очереди: обработка изображения сохранённой публикации."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        update_post_variants(post)
+
+
+def srcset(image_variants, image_format):
+    return ', '.join(
+        f'{image_storage.url(variant["name"])} {variant["width"]}w'
+        for variant in image_variants.get('variants', ())
+        if variant['format'] == image_format
+    )
+
+
+def smallest_variant(image_variants, image_format='jpeg'):
+    return min(
+        (variant for variant in image_variants.get('variants', ())
+         if variant['format'] == image_format),
+        key=lambda variant: variant['width'],
+        default=None,
+    )
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from threading import Lock
+
+from .caching import aget_versions, get_versions
+from .constants import LOOKUP_CACHE_SIZE
+from .models import Category, Location
+
+
+class ModelLRUCache:
+    """Ограниченный по размеру кэш объектов модели в памяти процесса.
+
+    Содержимое сбрасывается, когда меняется версия тега tag в общем кэше,
+    поэтому изменения, сделанные в других процессах, тоже становятся видны.
+    """
+
+    def __init__(self, model, field, tag, maxsize=LOOKUP_CACHE_SIZE):
+        self.model = model
+        self.field = field
+        self.tag = tag
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._version = None
+        self._lock = Lock()
+
+    def _cached(self, version, keys):
+        with self._lock:
+            if version != self._version:
+                self._items.clear()
+                self._version = version
+            found = {}
+            for key in keys & self._items.keys():
+                self._items.move_to_end(key)
+                found[key] = self._items[key]
+        return found
+
+    def _filter(self, missing):
+        if len(missing) == 1:
+            return {self.field: next(iter(missing))}
+        return {f'{self.field}__in': missing}
+
+    def _store(self, version, loaded):
+        with self._lock:
+            if version == self._version:
+                self._items.update(loaded)
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+        return loaded
+
+    def get_many(self, keys):
+        keys = set(keys)
+        version, = get_versions(self.tag)
+        found = self._cached(version, keys)
+        missing = keys - found.keys()
+        if missing:
+            found.update(self._store(version, {
+                getattr(obj, self.field): obj
+                for obj in self.model.objects.filter(**self._filter(missing))
+            }))
+        return found
+
+    async def aget_many(self, keys):
+        """Асинхронный вариант get_many(): промахи читаются через async ORM."""
+        keys = set(keys)
+        version, = await aget_versions(self.tag)
+        found = self._cached(version, keys)
+        missing = keys - found.keys()
+        if missing:
+            found.update(self._store(version, {
+                getattr(obj, self.field): obj
+                async for obj in self.model.objects.filter(
+                    **self._filter(missing)
+                )
+            }))
+        return found
+
+    def get(self, key):
+        return self.get_many((key,)).get(key)
+
+    async def aget(self, key):
+        return (await self.aget_many((key,))).get(key)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._version = None
+
+
+categories_by_slug = ModelLRUCache(Category, 'slug', 'categories')
+categories_by_id = ModelLRUCache(Category, 'pk', 'categories')
+locations_by_id = ModelLRUCache(Location, 'pk', 'locations')
+
+
+def set_category_location(posts, categories, locations):
+    for post in posts:
+        if post.category_id in categories:
+            post.category = categories[post.category_id]
+        if post.location_id in locations:
+            post.location = locations[post.location_id]
+    return posts
+
+
+def category_ids(posts):
+    return {post.category_id for post in posts} - {None}
+
+
+def location_ids(posts):
+    return {post.location_id for post in posts} - {None}
+
+
+def attach_category_location(posts):
+    """Подставляет публикациям категории и местоположения из кэша."""
+    return set_category_location(
+        posts,
+        categories_by_id.get_many(category_ids(posts)),
+        locations_by_id.get_many(location_ids(posts)),
+    )
+
+
+async def aattach_category_location(posts):
+    """Асинхронный вариант attach_category_location()."""
+    return set_category_location(
+        posts,
+        await categories_by_id.aget_many(category_ids(posts)),
+        await locations_by_id.aget_many(location_ids(posts)),
+    )
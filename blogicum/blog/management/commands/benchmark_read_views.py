@@ -0,0 +1,138 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+SYNC_URLCONF = 'blogicum.urls'
+ASYNC_URLCONF = 'blogicum.urls_async'
+
+
+async def slow_asgi_client(application, scope, delay):
+    """Клиент, который медленно читает ответ: приём тела занимает delay."""
+    request_sent = False
+    statuses = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b''}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+        elif not message.get('more_body'):
+            await asyncio.sleep(delay)
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+def slow_wsgi_client(application, environ, delay):
+    """Тот же клиент для WSGI: поток-обработчик занят, пока клиент читает."""
+    statuses = []
+    response = application(
+        {**environ, 'wsgi.input': BytesIO()},
+        lambda status, headers: statuses.append(int(status.split()[0])),
+    )
+    b''.join(response)
+    time.sleep(delay)
+    response.close()
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность страниц чтения под ASGI и WSGI'
+        ' при медленных клиентах. Запросы выполняются в этом процессе,'
+        ' к текущей базе данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--clients', type=int, default=40)
+        parser.add_argument(
+            '--delay', type=float, default=0.1,
+            help='Время, за которое клиент читает ответ, в секундах.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков WSGI-сервера.',
+        )
+
+    def run_asgi(self, options):
+        application = ASGIHandler()
+        path, query = (options['path'].split('?', 1) + [''])[:2]
+
+        async def run():
+            return await asyncio.gather(*(
+                slow_asgi_client(application, {
+                    'type': 'http',
+                    'asgi': {'version': '3.0'},
+                    'http_version': '1.1',
+                    'method': 'GET',
+                    'scheme': 'http',
+                    'path': path,
+                    'raw_path': path.encode(),
+                    'query_string': query.encode(),
+                    'root_path': '',
+                    'headers': [(b'host', options['host'].encode())],
+                    'client': ('127.0.0.1', 50000 + number),
+                    'server': (options['host'], 80),
+                }, options['delay'])
+                for number in range(options['clients'])
+            ))
+
+        return async_to_sync(run)()
+
+    def run_wsgi(self, options):
+        application = WSGIHandler()
+        path, query = (options['path'].split('?', 1) + [''])[:2]
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SCRIPT_NAME': '',
+            'SERVER_NAME': options['host'],
+            'SERVER_PORT': '80',
+            'HTTP_HOST': options['host'],
+            'wsgi.url_scheme': 'http',
+        }
+        with ThreadPoolExecutor(options['workers']) as executor:
+            return list(executor.map(
+                lambda number: slow_wsgi_client(
+                    application, environ, options['delay']
+                ),
+                range(options['clients']),
+            ))
+
+    def measure(self, name, run, options):
+        start = time.perf_counter()
+        statuses = run(options)
+        elapsed = time.perf_counter() - start
+        if set(statuses) != {200}:
+            raise CommandError(f'{name}: ответы {sorted(set(statuses))}')
+        self.stdout.write(
+            f'{name}: {len(statuses) / elapsed:.1f} запр./с'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{options["clients"]} клиентов, чтение ответа'
+            f' {options["delay"] * 1000:.0f} мс, {options["path"]}'
+        )
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            self.measure('ASGI, async views', self.run_asgi, options)
+        with override_settings(ROOT_URLCONF=SYNC_URLCONF):
+            self.measure('ASGI, sync views', self.run_asgi, options)
+            self.measure(
+                f'WSGI, {options["workers"]} потока', self.run_wsgi, options
+            )
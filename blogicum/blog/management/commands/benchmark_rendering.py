@@ -0,0 +1,124 @@
+import time
+import tracemalloc
+from itertools import count
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import Client
+from django.test.utils import override_settings
+
+from blog.constants import POSTS_LIMIT
+from blog.models import Post
+from blog.templatetags.blog_tags import post_card_version
+
+
+def measure(render):
+    """Результат render() и время его выполнения в миллисекундах."""
+    start = time.perf_counter()
+    result = render()
+    return result, (time.perf_counter() - start) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время рендеринга частей страниц.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'benchmark', choices=('paginator', 'cards', 'streaming'),
+            help=(
+                'paginator — пагинатор при разном числе страниц, cards —'
+                ' карточки публикаций без кэша фрагментов и из него,'
+                ' streaming — лента целиком и потоком.'
+            ),
+        )
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument(
+            '--posts', type=int, default=POSTS_LIMIT,
+            help='Сколько публикаций из базы данных рендерить.',
+        )
+
+    def benchmark_paginator(self, options):
+        for num_pages in (100, 2_000, 100_000):
+            paginator = Paginator(
+                range(num_pages * POSTS_LIMIT), POSTS_LIMIT
+            )
+            page = paginator.page(num_pages // 2)
+            html, elapsed = measure(lambda: render_to_string(
+                'includes/paginator.html', {
+                    'page_obj': page,
+                    'page_range': paginator.get_elided_page_range(
+                        page.number
+                    ),
+                }
+            ))
+            self.stdout.write(
+                f'{num_pages} страниц: {len(html)} байт, {elapsed:.2f} мс'
+            )
+
+    def benchmark_cards(self, options):
+        posts = list(Post.objects.select_related(
+            'category', 'location', 'author'
+        ).order_by('-pub_date')[:options['posts']])
+        cache.delete_many([
+            make_template_fragment_key(
+                'post_card', (post.id, post_card_version(post))
+            )
+            for post in posts
+        ])
+
+        def render_cards():
+            return ''.join(
+                render_to_string('includes/post_card.html', {'post': post})
+                for post in posts
+            )
+
+        cold_html, cold = measure(render_cards)
+        warm_html, warm = measure(render_cards)
+        if warm_html != cold_html:
+            raise CommandError('Карточки из кэша отличаются от исходных.')
+        self.stdout.write(
+            f'{len(posts)} карточек: без кэша {cold:.2f} мс,'
+            f' из кэша {warm:.2f} мс'
+        )
+
+    def benchmark_streaming(self, options):
+        client = Client(SERVER_NAME=options['host'])
+        # Уникальный параметр запроса обходит кэш страниц для анонимных.
+        request_numbers = count()
+        separator = '&' if '?' in options['path'] else '?'
+
+        def get_page():
+            start = time.perf_counter()
+            response = client.get(
+                f'{options["path"]}{separator}_={next(request_numbers)}'
+            )
+            if response.status_code != 200:
+                raise CommandError(f'Ответ {response.status_code}')
+            chunks = iter(
+                response.streaming_content if response.streaming
+                else (response.content,)
+            )
+            size = len(next(chunks))
+            first_byte = (time.perf_counter() - start) * 1000
+            return first_byte, size + sum(len(chunk) for chunk in chunks)
+
+        for stream in (False, True):
+            with override_settings(BLOG_STREAM_LIST_PAGES=stream):
+                get_page()
+                (first_byte, size), total = measure(get_page)
+                tracemalloc.start()
+                get_page()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.stdout.write(
+                f'{"потоком" if stream else "целиком"}: первый байт'
+                f' {first_byte:.1f} мс, всего {total:.1f} мс,'
+                f' пик памяти {peak / 1024:.0f} КБ, {size} байт'
+            )
+
+    def handle(self, *args, **options):
+        getattr(self, f'benchmark_{options["benchmark"]}')(options)
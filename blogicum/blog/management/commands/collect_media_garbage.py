@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.constants import MEDIA_GC_GRACE
+from blog.images import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений, на которые не ссылается ни одна'
+        ' публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=MEDIA_GC_GRACE,
+            help=(
+                'Не трогать файлы, изменённые за последние столько секунд:'
+                ' ссылка на них может быть ещё не сохранена.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        deleted = collect_garbage(options['grace'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено файлов: {len(deleted)}')
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, make_excerpt
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Заполняет сохранённые анонсы публикаций по их тексту.'
+
+    def handle(self, *args, **options):
+        posts = []
+        updated = 0
+        for post in Post.objects.only('text').iterator(BATCH_SIZE):
+            post.excerpt = make_excerpt(post.text)
+            posts.append(post)
+            if len(posts) == BATCH_SIZE:
+                updated += Post.objects.bulk_update(posts, ('excerpt',))
+                posts = []
+        updated += Post.objects.bulk_update(posts, ('excerpt',))
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import update_post_variants
+from blog.models import Post
+
+BATCH_SIZE = 100
+
+
+def batches(posts, size):
+    """Публикации пачками по pk: курсор не остаётся открытым во время
+    записи, и обход не зависит от изменений уже пройденных строк."""
+    last_pk = 0
+    while batch := list(posts.filter(pk__gt=last_pk).order_by('pk')[:size]):
+        yield batch
+        last_pk = batch[-1].pk
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать варианты и для уже обработанных изображений.',
+        )
+
+    def handle(self, *args, **options):
+        updated = 0
+        posts = Post.objects.exclude(image='').only('image', 'image_variants')
+        for batch in batches(posts, BATCH_SIZE):
+            for post in batch:
+                if options['force']:
+                    post.image_variants = {}
+                try:
+                    updated += update_post_variants(post)
+                except OSError as error:
+                    self.stderr.write(f'{post.image.name}: {error}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано изображений: {updated}')
+        )
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.constants import SCHEDULER_POLL_INTERVAL
+from blog.scheduling import next_publication_time, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует отложенные записи точно в назначенное время. Без'
+        ' --once работает постоянно и спит до ближайшей публикации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Опубликовать наступившие записи и завершиться.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=SCHEDULER_POLL_INTERVAL,
+            help='Максимальная пауза между проверками, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # Одно «сейчас» на проверку: запись со временем между двумя
+            # вызовами timezone.now() иначе не попала бы ни в публикацию,
+            # ни в расчёт паузы.
+            now = timezone.now()
+            published = publish_due_posts(now)
+            if published:
+                self.stdout.write(f'Опубликовано записей: {published}')
+            if options['once']:
+                return
+            time.sleep(self.get_delay(options['interval'], now))
+
+    def get_delay(self, interval, now):
+        next_time = next_publication_time(now)
+        if next_time is None:
+            return interval
+        return min(
+            interval, max((next_time - timezone.now()).total_seconds(), 0)
+        )
@@ -0,0 +1,124 @@
+import gzip
+
+from django import forms
+from django.conf import settings
+from django.contrib.auth import forms as auth_forms
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Template
+
+from blog.css import find_classes, purge_css
+from blog.forms import CommentForm, PostForm
+
+SOURCE = 'static_dev/css/bootstrap.min.css'
+STYLESHEET = 'static_dev/css/blogicum.min.css'
+CRITICAL = 'templates/includes/critical_css.html'
+CRITICAL_TEMPLATES = (
+    'templates/base.html',
+    'templates/includes/header.html',
+    'templates/includes/post_card.html',
+)
+FORM_TEMPLATE = Template(
+    '{% load django_bootstrap5 %}{% bootstrap_form form %}'
+    '{% bootstrap_button button_type="submit" content="OK" %}'
+)
+
+
+class ProfileForm(forms.ModelForm):
+
+    class Meta:
+        model = User
+        fields = ('username', 'email', 'first_name', 'last_name')
+
+
+def form_classes():
+    """Классы из разметки, которую django_bootstrap5 выводит для форм
+    проекта — и пустых, и с ошибками. База данных не нужна: списки выбора
+    выводятся пустыми."""
+    form_classes = (
+        PostForm, CommentForm, ProfileForm, auth_forms.UserCreationForm,
+        auth_forms.PasswordResetForm,
+    )
+    classes = set()
+    for form in (
+        *(form_class() for form_class in form_classes),
+        *(form_class(data={}) for form_class in form_classes),
+        auth_forms.AuthenticationForm(), auth_forms.AuthenticationForm(
+            data={}
+        ),
+        auth_forms.PasswordChangeForm(User()),
+        auth_forms.PasswordChangeForm(User(), data={}),
+        auth_forms.SetPasswordForm(User(), data={}),
+    ):
+        for field in form.fields.values():
+            if isinstance(field, forms.ModelChoiceField):
+                field.queryset = field.queryset.none()
+        form.is_bound and form.is_valid()
+        classes |= find_classes(FORM_TEMPLATE.render(Context({'form': form})))
+    return classes
+
+
+def sizes(css):
+    data = css.encode()
+    compressed = gzip.compress(data)
+    return f'{len(data) / 1024:.1f} КБ (gzip {len(compressed) / 1024:.1f} КБ)'
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает из bootstrap.min.css только стили, используемые в шаблонах'
+        ' и формах, и встраиваемый в base.html критический CSS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить, что сохранённые стили не устарели.',
+        )
+
+    def handle(self, *args, **options):
+        base = settings.BASE_DIR
+        classes = form_classes()
+        for template in (base / 'templates').rglob('*.html'):
+            classes |= find_classes(template.read_text(encoding='utf-8'))
+        critical_classes = set()
+        for template in CRITICAL_TEMPLATES:
+            critical_classes |= find_classes(
+                (base / template).read_text(encoding='utf-8')
+            )
+
+        source = (base / SOURCE).read_text(encoding='utf-8')
+        stylesheet = purge_css(source, classes)
+        critical = purge_css(source, critical_classes, inline=True)
+        outputs = {
+            base / STYLESHEET: stylesheet,
+            base / CRITICAL: (
+                f'{{% verbatim %}}<style>{critical}</style>'
+                '{% endverbatim %}\n'
+            ),
+        }
+        if options['check']:
+            outdated = [
+                str(path.relative_to(base))
+                for path, content in outputs.items()
+                if not path.exists()
+                or path.read_text(encoding='utf-8') != content
+            ]
+            if outdated:
+                raise CommandError(
+                    'Стили устарели, запустите purge_css: '
+                    + ', '.join(outdated)
+                )
+            return
+        for path, content in outputs.items():
+            path.write_text(content, encoding='utf-8')
+
+        self.stdout.write(f'Классов в шаблонах и формах: {len(classes)}')
+        self.stdout.write(f'{SOURCE}: {sizes(source)}')
+        self.stdout.write(f'{STYLESHEET}: {sizes(stylesheet)}')
+        self.stdout.write(f'{CRITICAL}: {sizes(critical)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Размер стилей уменьшен в {len(source) / len(stylesheet):.1f}'
+            ' раза.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.querysets import recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев у публикаций.'
+
+    def handle(self, *args, **options):
+        updated = recount_comments(Post.objects.all())
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,178 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .constants import MEDIA_CACHE_TIMEOUT
+
+DIGEST_NAME_RE = re.compile(
+    r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.\w+$'
+)
+HASHED_STATIC_RE = re.compile(r'\.(?P<digest>[0-9a-f]{12})\.\w+$')
+RANGE_RE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Границы одного диапазона из заголовка Range или None.
+
+    Несколько диапазонов и непонятный синтаксис игнорируются — тогда
+    отдаётся весь файл, как разрешает RFC 9110. Для неудовлетворимого
+    диапазона возвращается (size, size).
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None or match['start'] == match['end'] == '':
+        return None
+    if match['start'] == '':
+        return max(size - int(match['end']), 0), size - 1
+    start = int(match['start'])
+    end = int(match['end']) if match['end'] else size - 1
+    if start >= size or end < start:
+        return size, size
+    return start, min(end, size - 1)
+
+
+def read_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, path, stat, etag):
+    size = stat.st_size
+    byte_range = None
+    if request.headers.get('Range') and (
+        request.headers.get('If-Range', etag) == etag
+    ):
+        byte_range = parse_range(request.headers['Range'], size)
+    if byte_range is None:
+        return FileResponse(open(path, 'rb'))
+    start, end = byte_range
+    if start == size:
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+    response = StreamingHttpResponse(
+        read_range(open(path, 'rb'), start, end - start + 1), status=206
+    )
+    response.headers['Content-Length'] = end - start + 1
+    response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def proxy_response(path, name):
+    response = HttpResponse()
+    if settings.MEDIA_SERVE_MODE == 'x-accel-redirect':
+        response.headers['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + name
+        )
+    else:
+        response.headers['X-Sendfile'] = path
+    # Тип файла определит фронтенд-сервер.
+    del response.headers['Content-Type']
+    return response
+
+
+def resolve_file(document_root, path):
+    try:
+        full_path = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден.')
+    return full_path
+
+
+def patch_file_cache_control(response, immutable):
+    if immutable:
+        patch_cache_control(
+            response, public=True, max_age=MEDIA_CACHE_TIMEOUT, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+
+
+def serve_file(request, document_root, path, name_re, offload=False,
+               precompressed=False):
+    """Отдаёт файл path из document_root с валидаторами и поддержкой Range.
+
+    Файлы, имя которых совпало с name_re, содержат в имени хэш содержимого
+    (группа digest) и кэшируются клиентами «навсегда». При precompressed
+    клиентам, принимающим gzip, отдаётся готовая копия path.gz, если она
+    есть; при offload отдача передаётся фронтенд-серверу.
+    """
+    full_path = resolve_file(document_root, path)
+    content_type, _ = mimetypes.guess_type(full_path)
+    encoding = None
+    if precompressed and os.path.isfile(f'{full_path}.gz'):
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            full_path = f'{full_path}.gz'
+            encoding = 'gzip'
+    stat = os.stat(full_path)
+
+    digest = name_re.search(path)
+    etag = quote_etag(
+        (digest['digest'] if digest
+         else f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+        + (f'-{encoding}' if encoding else '')
+    )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        if offload and settings.MEDIA_SERVE_MODE != 'django':
+            response = proxy_response(full_path, path)
+        else:
+            response = file_response(request, full_path, stat, etag)
+            response.headers['Content-Type'] = (
+                content_type or 'application/octet-stream'
+            )
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    response.headers['Accept-Ranges'] = 'bytes'
+    if precompressed:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    patch_file_cache_control(response, immutable=bool(digest))
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт загруженные файлы из MEDIA_ROOT.
+
+    Саму отдачу можно передать фронтенд-серверу, см.
+    settings.MEDIA_SERVE_MODE. Скрытые файлы и каталоги (например,
+    незаконченные загрузки) не отдаются.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404('Файл не найден.')
+    return serve_file(
+        request, settings.MEDIA_ROOT, path, DIGEST_NAME_RE, offload=True
+    )
+
+
+@require_safe
+def serve_static(request, path):
+    """Отдаёт собранную collectstatic статику из STATIC_ROOT."""
+    return serve_file(
+        request, settings.STATIC_ROOT, path, HASHED_STATIC_RE,
+        precompressed=True,
+    )
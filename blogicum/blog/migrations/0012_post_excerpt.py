@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:26
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+from blog.constants import EXCERPT_WORDS
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = list(Post.objects.only('text'))
+    for post in posts:
+        post.excerpt = Truncator(post.text).words(EXCERPT_WORDS, truncate=' …')
+    Post.objects.bulk_update(posts, ('excerpt',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
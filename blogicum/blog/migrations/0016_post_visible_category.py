@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:38
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def hide_posts_in_hidden_categories(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        Q(category__isnull=True) | Q(category__is_published=False)
+    ).update(is_visible=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Опубликована, время публикации уже наступило, и категория опубликована.', verbose_name='Видна в ленте'),
+        ),
+        migrations.RunPython(
+            hide_posts_in_hidden_categories, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:15
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.ContentAddressedStorage(), upload_to='posts_images', verbose_name='Изображение'),
+        ),
+    ]
@@ -1,9 +1,79 @@
+from functools import wraps
+from hashlib import md5
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.cache import cache
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.http import Http404, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.safestring import mark_safe
 from django.shortcuts import reverse, redirect
 
 from blog.models import Comment, Post
 from .forms import PostForm, CommentForm
-from .constants import POSTS_LIMIT
+from .caching import feed_cache_bucket, get_versions, make_key
+from .constants import (
+    PAGE_CACHE_TIMEOUT, PAGINATOR_ON_EACH_SIDE,
+    PAGINATOR_ON_ENDS, POSTS_LIMIT
+)
+from .lookups import aattach_category_location, attach_category_location
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
+
+
+def memoize_per_request(method):
+    """Кэширует результат метода view на время одного запроса."""
+
+    @wraps(method)
+    def wrapper(self):
+        memo = self.__dict__.setdefault('_request_memo', {})
+        if method.__name__ not in memo:
+            memo[method.__name__] = method(self)
+        return memo[method.__name__]
+
+    return wrapper
+
+
+def prime_memo(view, name, value):
+    """Сохраняет значение метода с memoize_per_request, загруженное заранее."""
+    view.__dict__.setdefault('_request_memo', {})[name] = value
+    return value
+
+
+def etag_validators(versions, request):
+    """ETag и время изменения страницы по версиям её тегов.
+
+    Страница вошедшего пользователя содержит CSRF-токен, поэтому в ETag
+    входит и CSRF-секрет: иначе после его смены браузер показал бы
+    сохранённую страницу со старым токеном, и отправка формы дала бы 403.
+    """
+    user, csrf_secret = request.user, ''
+    if user.is_authenticated:
+        get_token(request)
+        csrf_secret = request.META['CSRF_COOKIE']
+    etag = md5(
+        f'{versions}:{user.pk}:{csrf_secret}'.encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(etag), max(versions) // 10 ** 9
+
+
+def path_digest(request):
+    return md5(
+        request.get_full_path().encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def page_query(query):
+    """Параметры запроса без номера страницы и курсоров, для ссылок."""
+    query = query.copy()
+    for key in ('page', 'after', 'before'):
+        query.pop(key, None)
+    return f'{query.urlencode()}&' if query else ''
 
 
 class IsAuthorMixin(UserPassesTestMixin):
@@ -42,6 +112,363 @@ class CommentMixin(LoginRequiredMixin):
                        kwargs={'post_id': self.kwargs['post_id']})
 
 
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, не выполняя запросов и не рендеря шаблон.
+
+    Валидаторы берутся из версий тегов get_page_cache_tags(): версия — это
+    время последнего изменения, затронувшего страницу, включая удаления,
+    которых не видно по max(updated_at).
+    """
+
+    def get_page_cache_tags(self):
+        raise NotImplementedError
+
+    def get_validators(self):
+        return etag_validators(
+            get_versions(*self.get_page_cache_tags()), self.request
+        )
+
+    @staticmethod
+    def add_validators(response, etag, last_modified):
+        if response.status_code == HTTPStatus.OK:
+            response.headers.setdefault('ETag', etag)
+            response.headers.setdefault(
+                'Last-Modified', http_date(last_modified)
+            )
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.conditional_adispatch(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.add_validators(
+                super().dispatch(request, *args, **kwargs),
+                etag, last_modified,
+            )
+        return response
+
+    async def conditional_adispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+        etag, last_modified = await sync_to_async(self.get_validators)()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.add_validators(
+                await super().dispatch(request, *args, **kwargs),
+                etag, last_modified,
+            )
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует страницы целиком для анонимных GET-запросов.
+
+    Ключ строится на версиях тегов из get_page_cache_tags(), поэтому
+    сигналы моделей сбрасывают ровно те страницы, которые затронуты.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_tags(self):
+        raise NotImplementedError
+
+    def get_page_cache_key(self):
+        return make_key(
+            'page', self.get_page_cache_tags(), path_digest(self.request)
+        )
+
+    def should_cache_page(self, request):
+        return (request.method in ('GET', 'HEAD')
+                and not request.user.is_authenticated)
+
+    def store_page(self, key, response):
+        if (response.status_code == HTTPStatus.OK
+                and not response.streaming and not response.cookies):
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key, response, self.page_cache_timeout
+                )
+            )
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.page_cache_adispatch(request, *args, **kwargs)
+        if not self.should_cache_page(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key()
+        response = cache.get(key)
+        if response is None:
+            response = self.store_page(
+                key, super().dispatch(request, *args, **kwargs)
+            )
+        return response
+
+    async def page_cache_adispatch(self, request, *args, **kwargs):
+        if not self.should_cache_page(request):
+            return await super().dispatch(request, *args, **kwargs)
+        key = await sync_to_async(self.get_page_cache_key)()
+        response = await cache.aget(key)
+        if response is None:
+            response = self.store_page(
+                key, await super().dispatch(request, *args, **kwargs)
+            )
+        return response
+
+
+class StreamingListMixin:
+    """Потоковая отдача ленты при settings.BLOG_STREAM_LIST_PAGES.
+
+    Сразу отправляются <head> и шапка страницы, затем карточки публикаций
+    по одной, по мере рендеринга, и в конце пагинатор с подвалом. Потоком
+    отдаётся только первая страница: номер другой страницы может оказаться
+    неверным, а ответ 404 после начала отправки уже не вернуть.
+    """
+
+    stream_marker = mark_safe('<!-- posts -->')
+
+    def get_stream_context(self):
+        """Данные для частей страницы до и после списка публикаций."""
+        return {}
+
+    def should_stream(self):
+        query = self.request.GET
+        return (
+            settings.BLOG_STREAM_LIST_PAGES
+            and query.get(self.page_kwarg, '1') == '1'
+            and not {'after', 'before'} & query.keys()
+        )
+
+    def get(self, request, *args, **kwargs):
+        if not self.should_stream():
+            return super().get(request, *args, **kwargs)
+        head, tail = render_to_string(
+            self.template_name,
+            {**self.get_stream_context(), 'stream_marker': self.stream_marker},
+            request,
+        ).split(self.stream_marker)
+        stream_page = (
+            self.astream_page if self.view_is_async else self.stream_page
+        )
+        return StreamingHttpResponse(
+            stream_page(head, tail),
+            content_type='text/html; charset=utf-8',
+        )
+
+    def render_posts(self):
+        self.object_list = self.get_queryset()
+        context = self.get_context_data()
+        for post in context['page_obj']:
+            yield render_to_string(
+                'includes/post_article.html', {'post': post}, self.request
+            )
+        yield render_to_string(
+            'includes/paginator.html', context, self.request
+        )
+
+    def stream_page(self, head, tail):
+        yield head
+        yield from self.render_posts()
+        yield tail
+
+    async def astream_page(self, head, tail):
+        yield head
+        await self.aload_page()
+        chunks = self.render_posts()
+        while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+            yield chunk
+        yield tail
+
+
 class PostPaginateMixin():
     model = Post
     paginate_by = POSTS_LIMIT
+    paginator_class = CachedCountPaginator
+    cursor_paginate = False
+    page_range_on_each_side = PAGINATOR_ON_EACH_SIDE
+    page_range_on_ends = PAGINATOR_ON_ENDS
+    loaded_page = None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_query'] = page_query(self.request.GET)
+        page = context['page_obj']
+        if page is not None and not self.cursor_paginate:
+            context['page_range'] = page.paginator.get_elided_page_range(
+                page.number,
+                on_each_side=self.page_range_on_each_side,
+                on_ends=self.page_range_on_ends,
+            )
+        return context
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            cache_key=self.get_count_cache_key(), **kwargs
+        )
+
+    def get_result_cache_key(self):
+        return None
+
+    def get_cached_page(self, queryset, page_size, key):
+        return self.restore_page(
+            queryset, page_size, cache.get(key) if key else None
+        )
+
+    def restore_page(self, queryset, page_size, cached):
+        if cached is None:
+            return None
+        objects, number, count, count_is_estimate = cached
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        paginator.count = count
+        paginator.count_is_estimate = count_is_estimate
+        page = paginator._get_page(objects, number, paginator)
+        return paginator, page, objects, page.has_other_pages()
+
+    def cache_page(self, key, result):
+        if key:
+            cache.set(key, self.page_to_cache(result), feed_cache_bucket())
+        return result
+
+    def page_to_cache(self, result):
+        paginator, page, _, _ = result
+        return (
+            page.object_list, page.number,
+            paginator.count, paginator.count_is_estimate,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.loaded_page is not None:
+            return self.loaded_page
+        if self.cursor_paginate:
+            return self.paginate_by_cursor(queryset, page_size)
+        key = self.get_result_cache_key()
+        return self.get_cached_page(queryset, page_size, key) or (
+            self.cache_page(key, self.paginate_and_attach(
+                queryset, page_size
+            ))
+        )
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """Асинхронный вариант paginate_queryset()."""
+        if self.cursor_paginate:
+            return await self.apaginate_by_cursor(queryset, page_size)
+        key = await sync_to_async(self.get_result_cache_key)()
+        if key:
+            cached = await sync_to_async(self.restore_page)(
+                queryset, page_size, await cache.aget(key)
+            )
+            if cached:
+                return cached
+        result = await self.apaginate_and_attach(queryset, page_size)
+        if key:
+            await cache.aset(
+                key, self.page_to_cache(result), feed_cache_bucket()
+            )
+        return result
+
+    def paginate_and_attach(self, queryset, page_size):
+        paginator, page, _, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        page.object_list = list(page.object_list)
+        if queryset.model is Post:
+            attach_category_location(page.object_list)
+        return paginator, page, page.object_list, is_paginated
+
+    async def apaginate_and_attach(self, queryset, page_size):
+        paginator = await sync_to_async(self.get_paginator)(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        number = (
+            self.kwargs.get(self.page_kwarg)
+            or self.request.GET.get(self.page_kwarg) or 1
+        )
+        if number == 'last':
+            await paginator.acount()
+            number = paginator.num_pages
+        try:
+            page = await paginator.apage(number)
+        except InvalidPage as error:
+            raise Http404(f'Неверная страница ({number}): {error}')
+        if queryset.model is Post:
+            await aattach_category_location(page.object_list)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_cursors(self):
+        return {
+            'after': self.request.GET.get('after'),
+            'before': self.request.GET.get('before'),
+        }
+
+    def paginate_by_cursor(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(**self.get_cursors())
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        attach_category_location(page.object_list)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_by_cursor(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = await paginator.apage(**self.get_cursors())
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        await aattach_category_location(page.object_list)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def aload_page(self):
+        """Загружает страницу через async ORM до синхронного рендеринга."""
+        if self.loaded_page is None:
+            queryset = self.get_queryset()
+            self.loaded_page = await self.apaginate_queryset(
+                queryset, self.get_paginate_by(queryset)
+            )
+
+
+class AsyncListMixin:
+    """Асинхронный вариант страниц на ListView для запуска под ASGI.
+
+    Объекты, которые синхронная view загружает из базы данных, читаются
+    заранее через async ORM: prepare() — объекты из URL, aload_page() —
+    страница ленты. Дальше работает обычный код view и миксинов: условный
+    GET, кэш страниц, потоковая отдача и TemplateResponse. Кэш читается
+    через его асинхронные методы, а ключи, построенные на версиях тегов,
+    и шаблоны считаются через sync_to_async, чтобы не блокировать цикл
+    событий.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def prepare(self):
+        """Загружает объекты, от которых зависит страница, кроме ленты."""
+
+    async def get(self, request, *args, **kwargs):
+        await self.prepare()
+        if not (isinstance(self, StreamingListMixin) and self.should_stream()):
+            await self.aload_page()
+        return await sync_to_async(super().get)(request, *args, **kwargs)
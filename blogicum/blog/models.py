@@ -1,11 +1,21 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.text import Truncator
 
-from .constants import TITLE_LENGTH, SHORT_TITLE_LEN
+from .constants import EXCERPT_WORDS, TITLE_LENGTH, SHORT_TITLE_LEN
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
 
+class UpdatedAtQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+
 class CreatedAtModel(models.Model):
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
 
@@ -20,6 +30,9 @@ class PublishedCreatedModel(CreatedAtModel):
         default=True,
         help_text='Снимите галочку, чтобы скрыть публикацию.',
     )
+    updated_at = models.DateTimeField('Изменено', auto_now=True, db_index=True)
+
+    objects = UpdatedAtQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -54,9 +67,14 @@ class Location(PublishedCreatedModel):
         return self.name[:SHORT_TITLE_LEN]
 
 
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
 class Post(PublishedCreatedModel):
     title = models.CharField('Заголовок', max_length=TITLE_LENGTH)
     text = models.TextField('Текст')
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='Если установить дату и время в будущем —'
@@ -80,17 +98,77 @@ class Post(PublishedCreatedModel):
         verbose_name='Категория',
     )
     image = models.ImageField(
-        'Изображение', upload_to='posts_images', blank=True)
+        'Изображение', upload_to='posts_images', blank=True,
+        storage=ContentAddressedStorage())
+    image_variants = models.JSONField(
+        'Варианты изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    is_visible = models.BooleanField(
+        'Видна в ленте',
+        default=False,
+        editable=False,
+        help_text='Опубликована, время публикации уже наступило,'
+        ' и категория опубликована.',
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=True),
+                name='post_visible_feed_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_visible=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_visible=False),
+                name='post_scheduled_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:SHORT_TITLE_LEN]
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None and 'text' in update_fields:
+                update_fields.add('excerpt')
+        self.is_visible = bool(
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category_id is not None
+            and self.category.is_published
+        )
+        if update_fields is not None:
+            if {'is_published', 'pub_date', 'category'} & update_fields:
+                update_fields.add('is_visible')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 class Comment(CreatedAtModel):
     text = models.TextField('Текст комментария')
@@ -110,4 +188,4 @@ class Comment(CreatedAtModel):
         default_related_name = 'comments'
 
     def __str__(self):
-        return self.title[:SHORT_TITLE_LEN]
+        return self.text[:SHORT_TITLE_LEN]
@@ -0,0 +1,228 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage, InvalidPage, PageNotAnInteger, Paginator
+)
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .constants import FEED_COUNT_TIMEOUT
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(value, pk):
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        value, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Некорректный курсор страницы.')
+
+
+class CursorPage:
+    """Страница ленты без номера: ссылки строятся по курсорам."""
+
+    cursor_paginated = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.get_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.get_cursor(self.object_list[0])
+
+
+class CursorPaginator:
+    """Пагинация по ключу (field, pk) без OFFSET и COUNT(*)."""
+
+    def __init__(self, object_list, per_page, field='pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.field = field
+
+    def get_cursor(self, obj):
+        return encode_cursor(getattr(obj, self.field), obj.pk)
+
+    def _select(self, after, before):
+        field = self.field
+        if before:
+            value, pk = decode_cursor(before)
+            posts = self.object_list.filter(
+                Q(**{f'{field}__gt': value})
+                | Q(**{field: value, 'pk__gt': pk})
+            ).order_by(field, 'pk')
+        else:
+            posts = self.object_list.order_by(f'-{field}', '-pk')
+            if after:
+                value, pk = decode_cursor(after)
+                posts = posts.filter(
+                    Q(**{f'{field}__lt': value})
+                    | Q(**{field: value, 'pk__lt': pk})
+                )
+        return posts[:self.per_page + 1]
+
+    def _make_page(self, posts, after, before):
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        if before:
+            posts.reverse()
+            return CursorPage(posts, self, True, has_more)
+        return CursorPage(posts, self, has_more, bool(after))
+
+    def page(self, after=None, before=None):
+        return self._make_page(
+            list(self._select(after, before)), after, before
+        )
+
+    async def apage(self, after=None, before=None):
+        """Асинхронный вариант page(): объекты читаются через async ORM."""
+        return self._make_page(
+            [post async for post in self._select(after, before)],
+            after, before,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт общее число объектов из кэша.
+
+    Пока кэш пуст, страница выбирается с одним лишним объектом: если он
+    есть, известно лишь, что страниц «не меньше N», и COUNT(*) не
+    выполняется. Точное число сохраняется, как только оно становится
+    известным — на последней странице ленты.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, cache_key=None):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        self.cache_key = cache_key
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.cache_key) if self.cache_key else None
+        if count is None:
+            count = super().count
+            self._store_count(count)
+        return count
+
+    def page(self, number):
+        if self.cache_key is None or 'count' in self.__dict__:
+            return super().page(number)
+        count = cache.get(self.cache_key)
+        if count is not None:
+            self.count = count
+            return super().page(number)
+        return self._probe_page(number)
+
+    async def acount(self):
+        """Асинхронный вариант count."""
+        if 'count' not in self.__dict__:
+            count = None
+            if self.cache_key:
+                count = await cache.aget(self.cache_key)
+            if count is None:
+                count = await self.object_list.acount()
+                await self._astore_count(count)
+            self.count = count
+        return self.count
+
+    async def apage(self, number):
+        """Асинхронный вариант page(): объекты читаются через async ORM."""
+        if self.cache_key and 'count' not in self.__dict__:
+            count = await cache.aget(self.cache_key)
+            if count is None:
+                return await self._aprobe_page(number)
+            self.count = count
+        await self.acount()
+        page = super().page(number)
+        page.object_list = [obj async for obj in page.object_list]
+        return page
+
+    def _store_count(self, count):
+        if self.cache_key:
+            cache.set(self.cache_key, count, FEED_COUNT_TIMEOUT)
+
+    async def _astore_count(self, count):
+        if self.cache_key:
+            await cache.aset(self.cache_key, count, FEED_COUNT_TIMEOUT)
+
+    def _probe_bottom(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть числом.')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1.')
+        return number, (number - 1) * self.per_page
+
+    def _probe_result(self, number, bottom, objects):
+        if len(objects) > self.per_page:
+            self.count = bottom + len(objects)
+            self.count_is_estimate = True
+            objects = objects[:self.per_page]
+        elif objects or number == 1 and self.allow_empty_first_page:
+            self.count = bottom + len(objects)
+        else:
+            raise EmptyPage('На этой странице нет результатов.')
+        return self._get_page(objects, number, self)
+
+    def _probe_page(self, number):
+        number, bottom = self._probe_bottom(number)
+        page = self._probe_result(number, bottom, list(
+            self.object_list[bottom:bottom + self.per_page + 1]
+        ))
+        if not self.count_is_estimate:
+            self._store_count(self.count)
+        return page
+
+    async def _aprobe_page(self, number):
+        number, bottom = self._probe_bottom(number)
+        page = self._probe_result(number, bottom, [
+            obj async for obj in
+            self.object_list[bottom:bottom + self.per_page + 1]
+        ])
+        if not self.count_is_estimate:
+            await self._astore_count(self.count)
+        return page
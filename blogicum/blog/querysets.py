@@ -1,18 +1,38 @@
-from django.db.models import Count
+from django.db.models import (
+    BooleanField, Count, ExpressionWrapper, F, OuterRef, Q, Subquery
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from .models import Comment, Post
+
 
 def post_annotate(posts):
-    return posts.select_related(
-        'category', 'location', 'author'
-    ).annotate(
-        comment_count=Count('comments')
-    ).order_by('-pub_date')
+    return posts.select_related('author').defer('text').order_by('-pub_date')
 
 
 def post_filter_order(posts):
-    return posts.filter(
-        is_published=True,
-        category__is_published=True,
-        pub_date__lte=timezone.now(),
-    )
+    return posts.filter(is_visible=True)
+
+
+def change_comment_count(posts, delta):
+    return posts.update(comment_count=F('comment_count') + delta)
+
+
+def recount_comments(posts):
+    return posts.update(comment_count=Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+            'post'
+        ).annotate(count=Count('pk')).values('count')
+    ), 0))
+
+
+def update_category_visibility(category):
+    """Пересчитывает is_visible публикаций категории одним UPDATE."""
+    posts = Post.objects.filter(category=category)
+    if not category.is_published:
+        return posts.update(is_visible=False)
+    return posts.update(is_visible=ExpressionWrapper(
+        Q(is_published=True, pub_date__lte=timezone.now()),
+        output_field=BooleanField(),
+    ))
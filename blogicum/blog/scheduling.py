@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post
+from .signals import posts_published
+
+
+def scheduled_posts():
+    return Post.objects.filter(
+        is_published=True, is_visible=False, category__is_published=True
+    )
+
+
+@transaction.atomic
+def publish_due_posts(now=None):
+    """Делает видимыми публикации, время которых наступило."""
+    due = scheduled_posts().filter(pub_date__lte=now or timezone.now())
+    posts = list(due.values_list('pk', flat=True))
+    if posts:
+        Post.objects.filter(pk__in=posts).update(is_visible=True)
+        transaction.on_commit(
+            lambda: posts_published.send(sender=Post, posts=posts)
+        )
+    return len(posts)
+
+
+def next_publication_time(now=None):
+    return scheduled_posts().filter(
+        pub_date__gt=now or timezone.now()
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
@@ -0,0 +1,72 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'blog_post_fts'
+WORD_RE = re.compile(r'\w+')
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def make_match(query):
+    """Запрос FTS5 из слов пользователя: все слова, поиск по префиксу."""
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+
+def search_posts(posts, query):
+    """Публикации, найденные по запросу, от более к менее релевантным."""
+    match = make_match(query)
+    if not match:
+        return posts.none()
+    if not fts_enabled():
+        words = WORD_RE.findall(query)
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return posts.filter(condition)
+    # Индекс присоединяется один раз: MATCH выполняется единожды, а его
+    # столбец rank (bm25) сразу задаёт порядок.
+    return posts.extra(
+        select={'rank': f'{FTS_TABLE}.rank'},
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = blog_post.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        order_by=['rank', '-pub_date'],
+    )
+
+
+def index_post(post):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post.pk,))
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text)'
+            ' VALUES (%s, %s, %s)',
+            (post.pk, post.title, post.text),
+        )
+
+
+def unindex_post(post):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post.pk,))
+
+
+def rebuild_index():
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text)'
+            ' SELECT id, title, text FROM blog_post'
+        )
+        return cursor.rowcount
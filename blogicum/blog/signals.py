@@ -0,0 +1,184 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import Signal, receiver
+
+from .caching import bump, feed_tags
+from .images import needs_variants, process_post_image
+from .models import Category, Comment, Location, Post
+from .querysets import change_comment_count, update_category_visibility
+from .search import index_post, unindex_post
+from .tasks import image_queue
+
+User = get_user_model()
+
+posts_published = Signal()
+
+
+def remember_tags(instance, *tags):
+    instance._old_tags = {*tags}
+
+
+def bump_remembered(instance, *tags):
+    bump(*getattr(instance, '_old_tags', ()), *tags)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    remember_tags(instance, *feed_tags(Post.objects.filter(pk=instance.pk)))
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    bump_remembered(instance, *feed_tags(Post.objects.filter(pk=instance.pk)))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    bump_remembered(instance)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    instance._old_post_id = instance.pk and Comment.objects.filter(
+        pk=instance.pk
+    ).values_list('post', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    old_post_id = getattr(instance, '_old_post_id', None)
+    moved = old_post_id and old_post_id != instance.post_id
+    if created or moved:
+        change_comment_count(Post.objects.filter(pk=instance.post_id), 1)
+    if moved:
+        change_comment_count(Post.objects.filter(pk=old_post_id), -1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Срабатывает и при каскадном удалении, например вместе с автором.
+
+    Как и при добавлении, UPDATE счётчика заодно обновляет updated_at.
+    """
+    change_comment_count(Post.objects.filter(pk=instance.post_id), -1)
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_comment(sender, instance, created, **kwargs):
+    """Комментарий виден только на странице публикации, а ленты
+    показывают лишь число комментариев (тег comments)."""
+    tags = {f'post:{instance.post_id}'}
+    old_post_id = getattr(instance, '_old_post_id', None)
+    if old_post_id and old_post_id != instance.post_id:
+        tags |= {f'post:{old_post_id}', 'comments'}
+    if created:
+        tags.add('comments')
+    bump(*tags)
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_deleted_comment(sender, instance, **kwargs):
+    bump(f'post:{instance.post_id}', 'comments')
+
+
+@receiver(posts_published, sender=Post)
+def invalidate_published(sender, posts, **kwargs):
+    bump(*feed_tags(Post.objects.filter(pk__in=posts)))
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def remember_category_tags(sender, instance, **kwargs):
+    old_slug, instance._was_published = Category.objects.filter(
+        pk=instance.pk
+    ).values_list('slug', 'is_published').first() or (None, None)
+    if old_slug is not None:
+        remember_tags(
+            instance, 'category:*',
+            f'category:{old_slug}', f'category:{instance.slug}',
+        )
+
+
+@receiver(post_save, sender=Category)
+def update_posts_visibility(sender, instance, created, **kwargs):
+    if not created and instance.is_published != instance._was_published:
+        update_category_visibility(instance)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).update(is_visible=False)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    bump_remembered(instance, 'categories')
+
+
+@receiver(pre_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def remember_location_tags(sender, instance, **kwargs):
+    if instance.pk is not None:
+        remember_tags(instance, 'location:*', f'location:{instance.pk}')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    bump_remembered(instance, 'locations')
+
+
+@receiver(pre_save, sender=User)
+def remember_user_tags(sender, instance, update_fields=None, **kwargs):
+    instance._old_tags = set()
+    if instance.pk is None or update_fields is not None and set(
+        update_fields
+    ) <= {'last_login'}:
+        return
+    old_username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    remember_tags(
+        instance, 'author:*',
+        f'author:{old_username}', f'author:{instance.username}',
+    )
+
+
+@receiver(pre_delete, sender=User)
+def remember_deleted_user_tags(sender, instance, **kwargs):
+    remember_tags(instance, 'author:*', f'author:{instance.username}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    bump_remembered(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_processing(sender, instance, update_fields=None,
+                             **kwargs):
+    if (update_fields is None or 'image' in update_fields) and (
+        needs_variants(instance)
+    ):
+        transaction.on_commit(
+            partial(image_queue.submit, process_post_image, instance.pk)
+        )
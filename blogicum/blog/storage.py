@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла — SHA-256 его содержимого.
+
+    Хэш считается во время записи загрузки на диск, файл раскладывается по
+    подкаталогам из первых символов хэша: posts_images/ab/cd/abcd….jpg.
+    Одинаковые файлы хранятся один раз, поэтому удалять их можно, только
+    когда на имя больше никто не ссылается, — это делает команда
+    collect_media_garbage. Повторно загруженный файл получает новое время
+    изменения, чтобы сборщик не удалил его, пока ссылка на него ещё не
+    сохранена.
+
+    Загрузка пишется во временный файл в скрытом подкаталоге TEMP_DIR
+    каталога загрузки: такие пути не отдаются наружу, а файлы, брошенные
+    упавшим процессом, удаляет тот же сборщик мусора.
+    """
+
+    TEMP_DIR = '.incoming'
+
+    def digest_name(self, directory, digest, extension):
+        return posixpath.join(
+            directory, digest[:2], digest[2:4], f'{digest}{extension}'
+        )
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        temp_dir = self.path(posixpath.join(directory, self.TEMP_DIR))
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir, prefix='upload-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    file.write(chunk)
+            name = self.digest_name(directory, digest.hexdigest(), extension)
+            full_path = self.path(name)
+            if not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, full_path)
+            else:
+                os.utime(full_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и готовыми копиями .gz.
+
+    Файла, которого нет в манифесте (collectstatic ещё не запускался —
+    например, в тестах), отдаётся под исходным именем вместо ошибки.
+    """
+
+    manifest_strict = False
+    compress_extensions = ('.css', '.js', '.svg', '.ico', '.json', '.txt')
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(self.compress_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            data = file.read()
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data):
+            with open(f'{path}.gz', 'wb') as file:
+                file.write(compressed)
@@ -0,0 +1,106 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """Очередь задач, выполняемых пулом потоков вне потока запроса.
+
+    При settings.BLOG_TASKS_SYNC задачи выполняются сразу, в вызывающем
+    потоке — так их удобно проверять в тестах.
+
+    Очередь живёт в памяти процесса: задачи, не выполненные к перезапуску,
+    теряются. Недостающие варианты изображений восстанавливает команда
+    generate_image_variants.
+    """
+
+    def __init__(self, name, workers=None):
+        self.name = name
+        self.workers = workers
+        self._executor = None
+        self._lock = Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers or settings.BLOG_TASK_WORKERS,
+                    thread_name_prefix=f'blog-{self.name}',
+                )
+            return self._executor
+
+    @property
+    def depth(self):
+        """Число задач, поставленных в очередь и ещё не завершённых."""
+        return self.submitted - self.completed - self.failed
+
+    def stats(self):
+        finished = self.completed + self.failed or 1
+        return {
+            'depth': self.depth,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_wait': self.total_wait / finished,
+            'max_wait': self.max_wait,
+            'avg_run': self.total_run / finished,
+        }
+
+    def submit(self, func, *args):
+        with self._lock:
+            self.submitted += 1
+        queued = time.monotonic()
+        if settings.BLOG_TASKS_SYNC:
+            return self._run(queued, func, *args)
+        return self.executor.submit(self._run, queued, func, *args)
+
+    def _run(self, queued, func, *args):
+        started = time.monotonic()
+        failed = True
+        if not settings.BLOG_TASKS_SYNC:
+            close_old_connections()
+        try:
+            result = func(*args)
+            failed = False
+            return result
+        except Exception:
+            logger.exception('Задача %s%r завершилась с ошибкой', func, args)
+        finally:
+            if not settings.BLOG_TASKS_SYNC:
+                close_old_connections()
+            finished = time.monotonic()
+            with self._lock:
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self.total_wait += started - queued
+                self.total_run += finished - started
+                self.max_wait = max(self.max_wait, started - queued)
+            logger.info(
+                'Очередь %s: задача %s ждала %.3f с, выполнялась %.3f с,'
+                ' в очереди %d', self.name, func.__name__,
+                started - queued, finished - started, self.depth,
+            )
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+image_queue = TaskQueue('images')
@@ -0,0 +1,51 @@
+from django import template
+
+from blog.caching import get_versions
+from blog.images import image_storage, needs_variants, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Версия карточки: меняется вместе с публикацией, её категорией,
+    местоположением, автором и числом комментариев."""
+    versions = get_versions(
+        f'post:{post.pk}',
+        f'category:{post.category and post.category.slug}',
+        f'location:{post.location_id}',
+        f'author:{post.author.username}',
+    )
+    return '.'.join(map(str, (*versions, post.comment_count)))
+
+
+@register.filter
+def image_ready(post):
+    """Изображение обработано: EXIF удалены, варианты созданы."""
+    return bool(post.image) and not needs_variants(post)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, css_class='', sizes='(max-width: 40rem) 100vw, 40rem'):
+    """Изображение публикации с вариантами разных размеров и форматов.
+
+    Пока варианты не пересозданы для текущего изображения, выводится
+    заглушка, а не варианты прежнего.
+    """
+    image_variants = {} if needs_variants(post) else post.image_variants
+    variants = [
+        variant for variant in image_variants.get('variants', ())
+        if variant['format'] == 'jpeg'
+    ]
+    fallback = max(
+        variants, key=lambda variant: variant['width'], default=None
+    )
+    return {
+        'post': post,
+        'css_class': css_class,
+        'sizes': sizes,
+        'fallback': fallback,
+        'fallback_url': fallback and image_storage.url(fallback['name']),
+        'webp_srcset': srcset(image_variants, 'webp'),
+        'jpeg_srcset': srcset(image_variants, 'jpeg'),
+    }
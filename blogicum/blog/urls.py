@@ -10,6 +10,11 @@ urlpatterns = [
         views.IndexListView.as_view(),
         name='index'
     ),
+    path(
+        'search/',
+        views.SearchListView.as_view(),
+        name='search'
+    ),
     path(
         'auth/registration/',
         views.UserCreateView.as_view(),
@@ -0,0 +1,29 @@
+from django.urls import path
+
+from . import async_views, urls
+
+app_name = 'blog'
+
+urlpatterns = [
+    path(
+        '',
+        async_views.AsyncIndexListView.as_view(),
+        name='index'
+    ),
+    path(
+        'posts/<int:post_id>/',
+        async_views.AsyncPostDetailView.as_view(),
+        name='post_detail'
+    ),
+    path(
+        'category/<slug:category_slug>/',
+        async_views.AsyncCategoryListView.as_view(),
+        name='category_posts'
+    ),
+    path(
+        'profile/<slug:username>/',
+        async_views.AsyncProfileListView.as_view(),
+        name='profile'
+    ),
+    *urls.urlpatterns,
+]
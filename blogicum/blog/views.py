@@ -1,31 +1,52 @@
 from django.contrib.auth.models import User
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, reverse
 from django.views.generic import (
     ListView, UpdateView, CreateView, DeleteView
 )
 
-from blog.models import Category, Post
+from blog.models import Post
+from .caching import feed_cache_bucket, make_key, time_bucket
 from .forms import CommentForm, PostForm
-from .mixins import CommentMixin, IsAuthorMixin, PostMixin, PostPaginateMixin
-from .constants import POSTS_LIMIT
+from .lookups import attach_category_location, categories_by_slug
+from .mixins import (
+    AnonymousPageCacheMixin, CommentMixin, ConditionalGetMixin,
+    IsAuthorMixin, PostMixin, PostPaginateMixin, StreamingListMixin,
+    memoize_per_request
+)
 from .querysets import post_annotate, post_filter_order
+from .search import search_posts
 
 
-class IndexListView(ListView):
-    model = Post
-    paginate_by = POSTS_LIMIT
+class IndexListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                    StreamingListMixin, PostPaginateMixin, ListView):
     template_name = 'blog/index.html'
-    queryset = post_filter_order(post_annotate(Post.objects))
 
+    def get_queryset(self):
+        return post_filter_order(post_annotate(Post.objects))
 
-class ProfileListView(ListView):
-    model = Post
-    paginate_by = POSTS_LIMIT
+    def get_count_cache_key(self):
+        return make_key('count', ('posts', 'category:*'), 'index')
+
+    def get_page_cache_tags(self):
+        return ('posts', 'comments', 'category:*', 'location:*', 'author:*')
+
+    def get_result_cache_key(self):
+        return make_key(
+            'index', self.get_page_cache_tags(),
+            time_bucket(feed_cache_bucket()),
+            self.request.GET.get(self.page_kwarg) or 1,
+        )
+
+
+class ProfileListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                      StreamingListMixin, PostPaginateMixin, ListView):
     template_name = 'blog/profile.html'
 
+    @memoize_per_request
     def get_profile(self):
         return get_object_or_404(User, username=self.kwargs['username'])
 
@@ -34,6 +55,22 @@ class ProfileListView(ListView):
         context['profile'] = self.get_profile()
         return context
 
+    def get_stream_context(self):
+        return {'profile': self.get_profile()}
+
+    def get_page_cache_tags(self):
+        return (
+            f'author:{self.kwargs["username"]}',
+            'comments', 'category:*', 'location:*',
+        )
+
+    def get_count_cache_key(self):
+        return make_key(
+            'count', (f'author:{self.kwargs["username"]}', 'category:*'),
+            'profile',
+            self.get_profile() == self.request.user
+        )
+
     def get_queryset(self):
         posts = post_annotate(self.get_profile().posts.all())
 
@@ -75,14 +112,32 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class CategoryListView(PostPaginateMixin, ListView):
+class CategoryListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                       StreamingListMixin, PostPaginateMixin, ListView):
     template_name = 'blog/category.html'
 
+    @staticmethod
+    def check_published(category):
+        if category is None or not category.is_published:
+            raise Http404('Категория не найдена.')
+        return category
+
+    @memoize_per_request
     def get_category(self):
-        return get_object_or_404(
-            Category,
-            is_published=True,
-            slug=self.kwargs['category_slug']
+        return self.check_published(
+            categories_by_slug.get(self.kwargs['category_slug'])
+        )
+
+    def get_page_cache_tags(self):
+        return (
+            f'category:{self.kwargs["category_slug"]}',
+            'comments', 'location:*', 'author:*',
+        )
+
+    def get_count_cache_key(self):
+        return make_key(
+            'count', (f'category:{self.kwargs["category_slug"]}',),
+            'category',
         )
 
     def get_queryset(self):
@@ -93,27 +148,62 @@ class CategoryListView(PostPaginateMixin, ListView):
         context['category'] = self.get_category()
         return context
 
+    def get_stream_context(self):
+        return {'category': self.get_category()}
+
+
+class SearchListView(PostPaginateMixin, ListView):
+    template_name = 'blog/search.html'
 
-class PostDetailView(PostPaginateMixin, ListView):
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(
+            post_filter_order(post_annotate(Post.objects)),
+            self.get_search_query(),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        return context
+
+
+class PostDetailView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                     PostPaginateMixin, ListView):
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
+    def get_page_cache_tags(self):
+        return (
+            f'post:{self.kwargs[self.pk_url_kwarg]}',
+            'category:*', 'location:*', 'author:*',
+        )
+
     def get_queryset(self):
-        return self.get_object().comments.all()
+        return self.get_object().comments.select_related('author').only(
+            'text', 'created_at', 'post', 'author__username'
+        )
 
+    def get_post_queryset(self):
+        return Post.objects.select_related('author')
+
+    @memoize_per_request
     def get_object(self):
         post = get_object_or_404(
-            Post.objects.select_related('category', 'location', 'author'),
-            pk=self.kwargs['post_id'],
+            self.get_post_queryset(), pk=self.kwargs['post_id']
         )
+        attach_category_location((post,))
+        return self.check_visible(post)
 
+    def check_visible(self, post):
         if post.author == self.request.user:
             return post
 
-        return get_object_or_404(
-            post_filter_order(Post.objects),
-            pk=self.kwargs[self.pk_url_kwarg],
-        )
+        if not post.is_visible:
+            raise Http404('Публикация не найдена.')
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -59,6 +59,33 @@ DATABASES = {
     }
 }
 
+# Файловый кэш годится для разработки и одного сервера. Ключей здесь много
+# (страницы, карточки, версии тегов), поэтому лимит поднят: при переполнении
+# FileBasedCache на каждой записи обходит каталог и удаляет случайные ключи,
+# в том числе версии тегов, — зависящие от них кэши остывают. В продакшене
+# используйте общий memcached или Redis, например:
+# {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#  'LOCATION': 'redis://127.0.0.1:6379'}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+            'CULL_FREQUENCY': 10,
+        },
+    }
+}
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'blog.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -86,6 +113,8 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
 STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
@@ -103,3 +132,17 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+MEDIA_URL = '/media/'
+
+# 'django' — файлы отдаёт Django; 'x-accel-redirect' (nginx) и 'x-sendfile'
+# (Apache, lighttpd) передают отдачу файла фронтенд-серверу.
+MEDIA_SERVE_MODE = 'django'
+
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+BLOG_TASK_WORKERS = 2
+
+BLOG_TASKS_SYNC = False
+
+BLOG_STREAM_LIST_PAGES = False
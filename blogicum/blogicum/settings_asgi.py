@@ -0,0 +1,7 @@
+"""Настройки для запуска под ASGI с асинхронными страницами чтения.
+
+Включаются явно: DJANGO_SETTINGS_MODULE=blogicum.settings_asgi.
+"""
+from .settings import *  # noqa: F401, F403
+
+ROOT_URLCONF = 'blogicum.urls_async'
@@ -1,8 +1,9 @@
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import path, include
 
+from blog.media import serve_media, serve_static
+
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
@@ -11,4 +12,12 @@ urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
     path('auth/', include('django.contrib.auth.urls')),
     path('pages/', include('pages.urls', namespace='pages')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        f'{settings.MEDIA_URL.strip("/")}/<path:path>', serve_media,
+        name='media',
+    ),
+    path(
+        f'{settings.STATIC_URL.strip("/")}/<path:path>', serve_static,
+        name='static',
+    ),
+]
@@ -0,0 +1,12 @@
+from django.urls import include, path
+
+from . import urls
+
+handler404 = urls.handler404
+handler500 = urls.handler500
+
+urlpatterns = [
+    path('', include('blog.urls_async', namespace='blog'))
+    if getattr(pattern, 'namespace', None) == 'blog' else pattern
+    for pattern in urls.urlpatterns
+]
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,31 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def run_tasks_synchronously():
+    with override_settings(BLOG_TASKS_SYNC=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def use_locmem_cache():
+    with override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(use_locmem_cache):
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +389,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,224 @@
+import asyncio
+import re
+from functools import wraps
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import close_old_connections, connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import mixins
+from blog.mixins import AsyncListMixin, PostPaginateMixin
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="[^"]*"')
+ASYNC_URLCONF = 'blogicum.urls_async'
+
+
+def normalize(html):
+    return ' '.join(CSRF_RE.sub('', html).split())
+
+
+@pytest.fixture
+def read_urls(mixer, user, published_category, post_with_published_location):
+    mixer.cycle(12).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    mixer.cycle(3).blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+    return (
+        '/',
+        '/?page=2',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{post_with_published_location.id}/',
+    )
+
+
+def get_async(async_client, url):
+    response = async_to_sync(async_client.get)(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что асинхронная страница {url} открывается.'
+    )
+    assert issubclass(
+        response.resolver_match.func.view_class, AsyncListMixin
+    ), f'Убедитесь, что страница {url} обслуживается асинхронной view.'
+    return response
+
+
+@pytest.mark.parametrize('logged_in', (False, True))
+def test_async_pages_match_sync(
+        client, async_client, settings, user, read_urls, logged_in
+):
+    if logged_in:
+        client.force_login(user)
+        async_client.force_login(user)
+    for url in read_urls:
+        cache.clear()
+        expected = client.get(url).content.decode('utf-8')
+        settings.ROOT_URLCONF = ASYNC_URLCONF
+        cache.clear()
+        content = get_async(async_client, url).content.decode('utf-8')
+        settings.ROOT_URLCONF = 'blogicum.urls'
+        assert normalize(content) == normalize(expected), (
+            f'Убедитесь, что асинхронная страница {url} совпадает с'
+            ' синхронной.'
+        )
+
+
+def test_async_not_found(
+        async_client, settings, mixer, user, published_category
+):
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False,
+    )
+    unpublished = mixer.blend('blog.Category', is_published=False)
+    for url in (
+        f'/posts/{hidden.id}/',
+        f'/category/{unpublished.slug}/',
+        '/category/missing/',
+        '/profile/missing/',
+        '/?page=99',
+    ):
+        response = async_to_sync(async_client.get)(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Убедитесь, что асинхронная страница {url} возвращает 404.'
+        )
+    async_client.force_login(user)
+    response = async_to_sync(async_client.get)(f'/posts/{hidden.id}/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что автор видит свою снятую с публикации запись.'
+    )
+
+
+def test_async_conditional_get(async_client, settings, read_urls):
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+    response = async_to_sync(async_client.get)('/')
+    response = async_to_sync(async_client.get)(
+        '/', headers={'if-none-match': response.headers['ETag']}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что асинхронная лента отвечает 304 по ETag.'
+    )
+
+
+def count_queries(get, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as captured:
+        get(url)
+    return len(captured)
+
+
+def test_async_pages_run_same_queries(
+        client, async_client, settings, read_urls
+):
+    for url in read_urls:
+        expected = count_queries(client.get, url)
+        settings.ROOT_URLCONF = ASYNC_URLCONF
+        queries = count_queries(async_to_sync(async_client.get), url)
+        settings.ROOT_URLCONF = 'blogicum.urls'
+        assert queries == expected, (
+            f'Убедитесь, что асинхронная страница {url} выполняет те же'
+            ' запросы, что и синхронная.'
+        )
+
+
+def test_async_page_cache_is_shared(client, async_client, settings, read_urls):
+    client.get('/')
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+    with CaptureQueriesContext(connection) as captured:
+        get_async(async_client, '/')
+    assert not captured, (
+        'Убедитесь, что асинхронная лента берёт страницу из того же кэша,'
+        ' что и синхронная.'
+    )
+
+
+def test_async_cursor_pagination(
+        async_client, settings, monkeypatch, read_urls
+):
+    monkeypatch.setattr(PostPaginateMixin, 'cursor_paginate', True)
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+    response = get_async(async_client, '/')
+    after = response.context['page_obj'].next_cursor
+    assert after, 'Убедитесь, что у первой страницы есть курсор следующей.'
+    response = get_async(async_client, f'/?after={after}')
+    assert len(response.context['page_obj']) == 3
+
+
+def test_async_streaming(client, async_client, settings, read_urls):
+    settings.BLOG_STREAM_LIST_PAGES = True
+    expected = b''.join(client.get('/').streaming_content)
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+    cache.clear()
+    response = get_async(async_client, '/')
+    assert response.streaming and response.is_async, (
+        'Убедитесь, что асинхронная лента отдаётся асинхронным потоком.'
+    )
+
+    async def consume():
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    assert normalize(async_to_sync(consume)().decode('utf-8')) == normalize(
+        expected.decode('utf-8')
+    ), 'Убедитесь, что потоковая асинхронная лента совпадает с синхронной.'
+
+
+def off_event_loop(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return function(*args, **kwargs)
+        raise AssertionError(
+            f'Убедитесь, что {function.__qualname__}() не вызывается'
+            ' в цикле событий асинхронной view.'
+        )
+    return wrapper
+
+
+@pytest.mark.parametrize('stream', (False, True))
+def test_async_pages_do_not_block_event_loop(
+        async_client, settings, monkeypatch, read_urls, stream
+):
+    backend = type(caches['default'])
+    for name in ('get', 'set', 'add', 'get_many'):
+        monkeypatch.setattr(
+            backend, name, off_event_loop(getattr(backend, name))
+        )
+    monkeypatch.setattr(
+        mixins, 'render_to_string', off_event_loop(mixins.render_to_string)
+    )
+    settings.BLOG_STREAM_LIST_PAGES = stream
+    settings.ROOT_URLCONF = ASYNC_URLCONF
+
+    async def consume(response):
+        return [chunk async for chunk in response.streaming_content]
+
+    for url in read_urls:
+        cache.clear()
+        for _ in range(2):
+            response = get_async(async_client, url)
+            if response.streaming:
+                async_to_sync(consume)(response)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_command_serves_all_requests(read_urls):
+    request_started.disconnect(close_old_connections)
+    try:
+        call_command(
+            'benchmark_read_views', host='testserver', clients=3,
+            delay=0, workers=2,
+        )
+    finally:
+        request_started.connect(close_old_connections)
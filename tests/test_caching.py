@@ -0,0 +1,312 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.template.loader import render_to_string
+
+from blog import caching
+from blog.caching import get_versions
+from blog.models import Post
+from blog.views import IndexListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def post_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "blog_post"' in query['sql']
+    ]
+
+
+def test_index_result_cache(
+        user_client, post_with_published_location,
+        django_assert_max_num_queries
+):
+    client = user_client
+    client.get('/')
+    with django_assert_max_num_queries(10) as captured:
+        response = client.get('/')
+    assert post_with_published_location in response.context['page_obj']
+    assert not post_queries(captured), (
+        'Убедитесь, что повторный запрос главной страницы берёт публикации'
+        ' из общего кэша результатов.'
+    )
+
+    post_with_published_location.title = 'Новый заголовок'
+    post_with_published_location.save()
+    assert 'Новый заголовок' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что кэш главной страницы сбрасывается при изменении'
+        ' публикации.'
+    )
+
+
+def test_feed_cache_bucket_setting(rf, settings, monkeypatch):
+    view = IndexListView()
+    view.setup(rf.get('/'))
+
+    def key_at(now):
+        monkeypatch.setattr(caching.time, 'time', lambda: now)
+        return view.get_result_cache_key()
+
+    assert key_at(100) == key_at(110)
+    settings.BLOG_FEED_CACHE_BUCKET = 5
+    assert key_at(100) != key_at(110), (
+        'Убедитесь, что длина интервала кэша ленты берётся из настройки'
+        ' BLOG_FEED_CACHE_BUCKET.'
+    )
+
+
+def test_feed_cache_bucket_setting_sets_timeout(
+        client, settings, monkeypatch, post_with_published_location
+):
+    settings.BLOG_FEED_CACHE_BUCKET = 5
+    default_cache = caches['default']
+    set_cache = default_cache.set
+    timeouts = {}
+
+    def spy(key, value, timeout=None, **kwargs):
+        timeouts[key] = timeout
+        return set_cache(key, value, timeout, **kwargs)
+
+    monkeypatch.setattr(default_cache, 'set', spy)
+    client.get('/')
+    assert [
+        timeout for key, timeout in timeouts.items()
+        if key.startswith('blog:index:')
+    ] == [5], (
+        'Убедитесь, что срок хранения страницы в кэше результатов тоже'
+        ' берётся из настройки BLOG_FEED_CACHE_BUCKET.'
+    )
+
+
+@pytest.fixture
+def cached_pages(post_with_published_location):
+    post = post_with_published_location
+    return {
+        'index': '/',
+        'category': f'/category/{post.category.slug}/',
+        'profile': f'/profile/{post.author.username}/',
+        'detail': f'/posts/{post.id}/',
+    }
+
+
+def test_anonymous_pages_are_cached(
+        client, cached_pages, django_assert_num_queries
+):
+    for url in cached_pages.values():
+        client.get(url)
+    for name, url in cached_pages.items():
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Убедитесь, что страница {url} отдаётся из кэша без запросов'
+            ' к базе данных.'
+        )
+
+
+def test_logged_in_pages_are_not_cached(user_client, cached_pages):
+    for url in cached_pages.values():
+        user_client.get(url)
+        assert user_client.get(url).context is not None
+
+
+@pytest.mark.parametrize(
+    'change, stale, fresh',
+    [
+        ('comment', (), ('index', 'category', 'profile', 'detail')),
+        ('location', (), ('index', 'category', 'profile', 'detail')),
+        ('other_category', ('index', 'category', 'profile', 'detail'), ()),
+        ('other_post', ('category', 'profile', 'detail'), ('index',)),
+    ],
+)
+def test_page_cache_invalidation(
+        client, mixer, another_user, cached_pages,
+        post_with_published_location, change, stale, fresh
+):
+    post = post_with_published_location
+    for url in cached_pages.values():
+        client.get(url)
+
+    if change == 'comment':
+        mixer.blend('blog.Comment', post=post, author=another_user)
+    elif change == 'location':
+        post.location.name = 'Другое место'
+        post.location.save()
+    elif change == 'other_category':
+        mixer.blend('blog.Category', is_published=True)
+    elif change == 'other_post':
+        mixer.blend(
+            'blog.Post', author=another_user,
+            category=mixer.blend('blog.Category', is_published=True),
+        )
+
+    for name in fresh:
+        assert client.get(cached_pages[name]).context is not None, (
+            f'Убедитесь, что изменение ({change}) сбрасывает кэш страницы'
+            f' {cached_pages[name]}.'
+        )
+    for name in stale:
+        assert client.get(cached_pages[name]).context is None, (
+            f'Убедитесь, что изменение ({change}) не сбрасывает кэш'
+            f' посторонней страницы {cached_pages[name]}.'
+        )
+
+
+def test_deleted_user_profile_is_not_served_from_cache(client, mixer):
+    user = mixer.blend('auth.User')
+    url = f'/profile/{user.username}/'
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    user.delete()
+    assert client.get(url).status_code == 404, (
+        'Убедитесь, что после удаления пользователя его профиль не'
+        ' отдаётся из кэша страниц.'
+    )
+
+
+def test_conditional_get(
+        user_client, mixer, another_user, cached_pages,
+        post_with_published_location, django_assert_max_num_queries
+):
+    validators = {}
+    for name, url in cached_pages.items():
+        response = user_client.get(url)
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'
+        ), f'Убедитесь, что страница {url} отдаёт ETag и Last-Modified.'
+        validators[name] = response['ETag']
+    for name, url in cached_pages.items():
+        with django_assert_max_num_queries(2) as captured:
+            response = user_client.get(
+                url, HTTP_IF_NONE_MATCH=validators[name]
+            )
+        assert response.status_code == 304 and response.context is None, (
+            f'Убедитесь, что неизменённая страница {url} возвращает 304'
+            ' без рендеринга шаблона.'
+        )
+        assert not post_queries(captured), (
+            f'Убедитесь, что для ответа 304 на {url} не запрашиваются'
+            ' публикации.'
+        )
+
+    mixer.blend(
+        'blog.Comment', post=post_with_published_location,
+        author=another_user,
+    )
+    for name, url in cached_pages.items():
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=validators[name])
+        assert response.status_code == 200, (
+            f'Убедитесь, что после нового комментария страница {url}'
+            ' отдаётся заново.'
+        )
+
+
+def test_conditional_get_follows_csrf_token(user_client, cached_pages):
+    url = cached_pages['detail']
+    etag = user_client.get(url)['ETag']
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    user_client.cookies['csrftoken'] = 'a' * 32
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что после смены CSRF-токена страница вошедшего'
+        ' пользователя отдаётся заново, а не ответом 304.'
+    )
+
+
+def render_card(post):
+    return render_to_string('includes/post_card.html', {'post': post})
+
+
+def test_post_card_fragment_cache(post_with_published_location):
+    post = post_with_published_location
+    assert post.title in render_card(post)
+
+    Post.objects.filter(pk=post.pk).update(title='Без сигнала')
+    post.refresh_from_db()
+    assert 'Без сигнала' not in render_card(post), (
+        'Убедитесь, что карточка публикации берётся из кэша фрагментов.'
+    )
+
+    post.save()
+    assert 'Без сигнала' in render_card(post), (
+        'Убедитесь, что версия карточки меняется при изменении публикации.'
+    )
+    post.comment_count += 1
+    assert f'({post.comment_count})' in render_card(post), (
+        'Убедитесь, что версия карточки зависит от числа комментариев.'
+    )
+
+
+@pytest.mark.parametrize('related', ('category', 'location', 'author'))
+def test_related_change_refreshes_card_without_fan_out(
+        mixer, post_with_published_location, related
+):
+    post = Post.objects.select_related(
+        'category', 'location', 'author'
+    ).get(pk=post_with_published_location.pk)
+    mixer.cycle(3).blend(
+        'blog.Post', author=post.author, category=post.category,
+        location=post.location,
+    )
+    render_card(post)
+    version, = get_versions(f'post:{post.pk}')
+
+    instance = getattr(post, related)
+    field = 'username' if related == 'author' else (
+        'title' if related == 'category' else 'name'
+    )
+    setattr(instance, field, 'renamed')
+    instance.save()
+    assert get_versions(f'post:{post.pk}') == (version,), (
+        f'Убедитесь, что изменение ({related}) не сбрасывает версии'
+        ' каждой связанной публикации по отдельности.'
+    )
+    assert 'renamed' in render_card(post), (
+        f'Убедитесь, что изменение ({related}) обновляет карточку'
+        ' публикации.'
+    )
+
+
+def test_cached_cards_match_rendered(
+        mixer, user, published_category, django_assert_num_queries
+):
+    posts = list(Post.objects.select_related(
+        'category', 'location', 'author'
+    ).filter(pk__in=[
+        post.pk for post in mixer.cycle(10).blend(
+            'blog.Post', author=user, category=published_category
+        )
+    ]))
+    cold_html = ''.join(render_card(post) for post in posts)
+    with django_assert_num_queries(0):
+        warm_html = ''.join(render_card(post) for post in posts)
+    assert warm_html == cold_html, (
+        'Убедитесь, что карточки из кэша фрагментов совпадают с'
+        ' отрендеренными.'
+    )
+    stdout = StringIO()
+    call_command('benchmark_rendering', 'cards', stdout=stdout)
+    assert '10 карточек' in stdout.getvalue()
+
+
+def test_updated_at_is_maintained(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    assert post.updated_at >= post.created_at
+
+    def updated_at():
+        return Post.objects.values_list('updated_at', flat=True).get(
+            pk=post.pk
+        )
+
+    before = updated_at()
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    after_update = updated_at()
+    assert after_update > before, (
+        'Убедитесь, что QuerySet.update() обновляет поле updated_at.'
+    )
+    mixer.blend('blog.Comment', post=post, author=user)
+    assert updated_at() > after_update, (
+        'Убедитесь, что новый комментарий обновляет updated_at публикации.'
+    )
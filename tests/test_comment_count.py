@@ -0,0 +1,88 @@
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from blog.models import Comment, Post
+from blog.querysets import recount_comments
+
+pytestmark = [pytest.mark.django_db]
+
+
+def comment_count(post):
+    return Post.objects.values_list('comment_count', flat=True).get(
+        pk=post.pk
+    )
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    return post_with_published_location
+
+
+@pytest.fixture
+def admin_client(mixer):
+    client = Client()
+    client.force_login(
+        mixer.blend('auth.User', is_staff=True, is_superuser=True)
+    )
+    return client
+
+
+def test_count_follows_create_and_delete(user_client, post):
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Текст'})
+    assert comment_count(post) == 1, (
+        'Убедитесь, что при добавлении комментария счётчик у публикации'
+        ' увеличивается.'
+    )
+    Comment.objects.get(post=post).delete()
+    assert comment_count(post) == 0, (
+        'Убедитесь, что при удалении комментария счётчик у публикации'
+        ' уменьшается.'
+    )
+
+
+def test_count_follows_admin_changes(admin_client, mixer, post, user):
+    other_post = mixer.blend('blog.Post', author=user)
+    comments = mixer.cycle(3).blend('blog.Comment', post=post, author=user)
+    admin_client.post(f'/admin/blog/comment/{comments[0].id}/change/', {
+        'text': comments[0].text,
+        'post': other_post.id,
+        'author': user.id,
+    })
+    assert (comment_count(post), comment_count(other_post)) == (2, 1), (
+        'Убедитесь, что при переносе комментария в админке счётчики обеих'
+        ' публикаций обновляются.'
+    )
+    admin_client.post('/admin/blog/comment/', {
+        'action': 'delete_selected',
+        '_selected_action': [comment.id for comment in comments],
+        'post': 'yes',
+    })
+    assert not Comment.objects.exists()
+    assert (comment_count(post), comment_count(other_post)) == (0, 0), (
+        'Убедитесь, что массовое удаление комментариев в админке обновляет'
+        ' счётчики.'
+    )
+
+
+def test_count_follows_cascade_delete(mixer, post, another_user):
+    mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    mixer.blend('blog.Comment', post=post)
+    assert comment_count(post) == 3
+    another_user.delete()
+    assert comment_count(post) == 1, (
+        'Убедитесь, что счётчик уменьшается, когда комментарии удаляются'
+        ' каскадно вместе с автором.'
+    )
+
+
+def test_recount_fixes_drift(mixer, post):
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=10)
+    assert recount_comments(Post.objects.filter(pk=post.pk)) == 1
+    assert comment_count(post) == 2
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+    call_command('recount_comments', stdout=None)
+    assert comment_count(post) == 2, (
+        'Убедитесь, что команда recount_comments пересчитывает счётчик.'
+    )
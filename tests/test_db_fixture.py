@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.management import call_command
+
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+FIXTURE = Path(__file__).resolve().parent.parent / 'db.json'
+
+
+def test_db_fixture_loads(client):
+    call_command('loaddata', FIXTURE, verbosity=0)
+    assert Post.objects.exists()
+    assert not Post.objects.filter(excerpt='').exists(), (
+        'Убедитесь, что в db.json у публикаций заполнены анонсы.'
+    )
+    response = client.get('/')
+    assert len(BeautifulSoup(
+        response.content.decode('utf-8'), 'html.parser'
+    ).find_all('article')) == N_PER_PAGE, (
+        'Убедитесь, что после загрузки db.json публикации видны в ленте.'
+    )
@@ -0,0 +1,335 @@
+import os
+import time
+from hashlib import sha256
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from PIL import Image
+
+from blog.admin import PostAdmin
+from blog.images import image_storage, update_post_variants
+from blog.management.commands import generate_image_variants
+from blog.models import Post
+from blog.tasks import TaskQueue
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_upload(size=(1600, 1200), name='photo.png'):
+    buffer = BytesIO()
+    Image.new('RGBA', size, (200, 100, 50, 128)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+def save_with_image(post, upload, capture_on_commit_callbacks):
+    post.image = upload
+    with capture_on_commit_callbacks(execute=True):
+        post.save()
+    post.refresh_from_db()
+    return post
+
+
+@pytest.fixture
+def post_with_image(
+        post_with_published_location, django_capture_on_commit_callbacks
+):
+    return save_with_image(
+        post_with_published_location, make_upload(),
+        django_capture_on_commit_callbacks,
+    )
+
+
+def test_variants_are_created(post_with_image, media_root):
+    variants = post_with_image.image_variants['variants']
+    assert {
+        (variant['width'], variant['format']) for variant in variants
+    } == {
+        (width, image_format)
+        for width in (320, 640, 1280) for image_format in ('webp', 'jpeg')
+    }, 'Убедитесь, что для изображения создаются варианты 320, 640 и 1280'
+    for variant in variants:
+        with Image.open(media_root / variant['name']) as image:
+            assert image.size == (variant['width'], variant['height'])
+
+
+def test_small_image_is_not_upscaled(
+        post_with_published_location, django_capture_on_commit_callbacks
+):
+    post = save_with_image(
+        post_with_published_location, make_upload(size=(200, 100)),
+        django_capture_on_commit_callbacks,
+    )
+    assert {
+        variant['width'] for variant in post.image_variants['variants']
+    } == {200}, 'Убедитесь, что маленькие изображения не увеличиваются.'
+
+
+@pytest.mark.parametrize('url', ('/', '/posts/{id}/', '/posts/{id}/delete/'))
+def test_pages_render_responsive_image(user_client, post_with_image, url):
+    content = user_client.get(url.format(id=post_with_image.id)).content
+    soup = BeautifulSoup(content.decode('utf-8'), features='html.parser')
+    image = soup.find('img', srcset=True)
+    assert image is not None and soup.find(
+        'source', type='image/webp'
+    ) is not None, (
+        f'Убедитесь, что на странице {url} изображение выводится с srcset и'
+        ' вариантом в формате WebP.'
+    )
+    assert image['loading'] == 'lazy'
+    assert image['width'] and image['height']
+    assert post_with_image.image.url not in image['src'], (
+        f'Убедитесь, что страница {url} не загружает исходное изображение.'
+    )
+
+
+def test_admin_photo_uses_thumbnail(post_with_image):
+    photo = PostAdmin(Post, None).photo(post_with_image)
+    thumbnail = min(
+        (variant for variant in post_with_image.image_variants['variants']
+         if variant['format'] == 'jpeg'),
+        key=lambda variant: variant['width'],
+    )
+    assert 'loading="lazy"' in photo and f'{thumbnail["name"]}"' in photo, (
+        'Убедитесь, что в админке выводится самый маленький вариант'
+        ' изображения.'
+    )
+
+
+def test_generate_image_variants_command(post_with_image, media_root):
+    Post.objects.filter(pk=post_with_image.pk).update(image_variants={})
+    call_command('generate_image_variants')
+    post_with_image.refresh_from_db()
+    assert len(post_with_image.image_variants['variants']) == 6
+
+
+def test_generate_image_variants_command_writes_in_batches(
+        post_with_image, mixer, monkeypatch
+):
+    monkeypatch.setattr(generate_image_variants, 'BATCH_SIZE', 2)
+    posts = mixer.cycle(4).blend(
+        'blog.Post', image=post_with_image.image.name
+    )
+    Post.objects.update(image_variants={})
+    saved = []
+
+    def on_save(sender, instance, **kwargs):
+        saved.append(instance)
+
+    post_save.connect(on_save, sender=Post)
+    try:
+        call_command('generate_image_variants', stdout=StringIO())
+    finally:
+        post_save.disconnect(on_save, sender=Post)
+    assert not saved, (
+        'Убедитесь, что команда записывает варианты через update(), не'
+        ' сохраняя публикации целиком.'
+    )
+    assert all(
+        len(post.image_variants['variants']) == 6
+        for post in Post.objects.filter(pk__in=[
+            post_with_image.pk, *(post.pk for post in posts)
+        ])
+    ), 'Убедитесь, что команда обрабатывает публикации во всех пачках.'
+
+
+def test_placeholder_until_processed(
+        user_client, post_with_published_location, media_root
+):
+    post = post_with_published_location
+    post.image = make_upload()
+    post.save()
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    assert 'image-placeholder.svg' in content, (
+        'Убедитесь, что до обработки изображения вместо него выводится'
+        ' заглушка.'
+    )
+    assert post.image.url not in content, (
+        'Убедитесь, что до обработки (и удаления EXIF) ссылка на исходное'
+        ' изображение не выводится.'
+    )
+    assert not (media_root / 'posts_images' / 'variants').exists(), (
+        'Убедитесь, что изображение обрабатывается не в потоке запроса, а'
+        ' после фиксации транзакции.'
+    )
+
+
+def test_placeholder_replaces_outdated_variants(
+        user_client, post_with_image, media_root
+):
+    old_variants = [
+        variant['name']
+        for variant in post_with_image.image_variants['variants']
+    ]
+    post_with_image.image = make_upload(size=(300, 300))
+    post_with_image.save()
+    content = user_client.get(
+        f'/posts/{post_with_image.id}/'
+    ).content.decode('utf-8')
+    assert 'image-placeholder.svg' in content and not any(
+        name in content for name in old_variants
+    ), (
+        'Убедитесь, что после замены изображения до его обработки выводится'
+        ' заглушка, а не варианты прежнего изображения.'
+    )
+
+
+def test_exif_is_stripped(
+        post_with_published_location, django_capture_on_commit_callbacks
+):
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new('RGB', (400, 200), 'red').save(buffer, 'JPEG', exif=exif)
+    post = save_with_image(
+        post_with_published_location,
+        SimpleUploadedFile('photo.jpg', buffer.getvalue(), 'image/jpeg'),
+        django_capture_on_commit_callbacks,
+    )
+    assert not post.image.name.endswith(
+        sha256(buffer.getvalue()).hexdigest() + '.jpg'
+    ), 'Убедитесь, что очищенная копия сохраняется под новым именем.'
+    with Image.open(post.image.path) as image:
+        assert not image.getexif() and image.size == (200, 400), (
+            'Убедитесь, что из исходного изображения удаляются EXIF, а само'
+            ' оно поворачивается по ориентации.'
+        )
+
+
+def test_task_queue_metrics(settings):
+    settings.BLOG_TASKS_SYNC = False
+    queue = TaskQueue('test', workers=2)
+    try:
+        futures = [queue.submit(time.sleep, 0.01) for _ in range(4)]
+        for future in futures:
+            future.result()
+        queue.submit(int, 'не число').result()
+    finally:
+        queue.shutdown()
+    stats = queue.stats()
+    assert (stats['depth'], stats['completed'], stats['failed']) == (0, 4, 1)
+    assert stats['max_wait'] >= 0 and stats['avg_run'] > 0
+
+
+def test_uploads_are_content_addressed_and_deduplicated(
+        mixer, user, published_category, media_root,
+        django_capture_on_commit_callbacks
+):
+    data = make_upload(size=(100, 100)).read()
+    posts = [
+        save_with_image(
+            mixer.blend('blog.Post', author=user, category=published_category),
+            SimpleUploadedFile(name, data, 'image/png'),
+            django_capture_on_commit_callbacks,
+        )
+        for name in ('first.png', 'second.png')
+    ]
+    digest = sha256(data).hexdigest()
+    assert {post.image.name for post in posts} == {
+        f'posts_images/{digest[:2]}/{digest[2:4]}/{digest}.png'
+    }, (
+        'Убедитесь, что загруженные изображения хранятся под SHA-256'
+        ' содержимого, а одинаковые файлы — один раз.'
+    )
+    files = [posts[0].image.name] + [
+        variant['name'] for variant in posts[0].image_variants['variants']
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[0].delete()
+    collect_media_garbage(grace=0)
+    assert all((media_root / name).exists() for name in files), (
+        'Убедитесь, что файлы, на которые ссылаются другие публикации, не'
+        ' удаляются.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[1].delete()
+    collect_media_garbage()
+    assert all((media_root / name).exists() for name in files), (
+        'Убедитесь, что недавно изменённые файлы не удаляются: ссылка на'
+        ' них может быть ещё не сохранена.'
+    )
+    collect_media_garbage(grace=0)
+    assert not any((media_root / name).exists() for name in files), (
+        'Убедитесь, что файлы, на которые не ссылается ни одна публикация,'
+        ' удаляет команда collect_media_garbage.'
+    )
+
+
+def collect_media_garbage(**options):
+    call_command('collect_media_garbage', stdout=StringIO(), **options)
+
+
+def test_replaced_image_is_collected(
+        post_with_image, media_root, django_capture_on_commit_callbacks
+):
+    old_files = [post_with_image.image.name] + [
+        variant['name']
+        for variant in post_with_image.image_variants['variants']
+    ]
+    post = save_with_image(
+        post_with_image, make_upload(size=(300, 300)),
+        django_capture_on_commit_callbacks,
+    )
+    collect_media_garbage(grace=0)
+    assert not any((media_root / name).exists() for name in old_files), (
+        'Убедитесь, что старые файлы заменённого изображения удаляются.'
+    )
+    assert all((media_root / name).exists() for name in [post.image.name] + [
+        variant['name'] for variant in post.image_variants['variants']
+    ]), 'Убедитесь, что файлы текущего изображения не удаляются.'
+
+
+def test_reused_upload_is_touched(media_root):
+    name = image_storage.save('posts_images/a.png', make_upload())
+    path = media_root / name
+    os.utime(path, (0, 0))
+    assert image_storage.save('posts_images/b.png', make_upload()) == name
+    assert path.stat().st_mtime > 0, (
+        'Убедитесь, что повторная загрузка того же файла обновляет время'
+        ' его изменения, чтобы сборщик мусора его не удалил.'
+    )
+
+
+def test_abandoned_upload_is_collected(media_root):
+    temp_dir = media_root / 'posts_images' / '.incoming'
+    temp_dir.mkdir(parents=True)
+    abandoned = temp_dir / 'upload-abandoned'
+    abandoned.write_bytes(b'part of an upload')
+    os.utime(abandoned, (0, 0))
+    image_storage.save('posts_images/a.png', make_upload())
+    assert [path.name for path in temp_dir.iterdir()] == [
+        'upload-abandoned'
+    ] and not list(media_root.glob('.upload-*')), (
+        'Убедитесь, что завершённая загрузка не оставляет временных файлов.'
+    )
+    collect_media_garbage()
+    assert not abandoned.exists(), (
+        'Убедитесь, что сборщик мусора удаляет брошенные временные файлы'
+        ' загрузок.'
+    )
+
+
+def test_stale_task_keeps_newer_image(post_with_image):
+    stale = Post.objects.get(pk=post_with_image.pk)
+    stale.image_variants = {}
+    Post.objects.filter(pk=stale.pk).update(
+        image='posts_images/newer.png', image_variants={}
+    )
+    assert not update_post_variants(stale)
+    post = Post.objects.get(pk=stale.pk)
+    assert (post.image.name, post.image_variants) == (
+        'posts_images/newer.png', {}
+    ), (
+        'Убедитесь, что обработка старого изображения не перезаписывает'
+        ' изображение, загруженное позже.'
+    )
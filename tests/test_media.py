@@ -0,0 +1,97 @@
+from hashlib import sha256
+
+import pytest
+from django.core.files.base import ContentFile
+
+from blog.images import image_storage
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 8
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def media_url():
+    name = image_storage.save('posts_images/file.png', ContentFile(CONTENT))
+    return image_storage.url(name)
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_media_is_served_with_immutable_caching(client, media_url):
+    response = client.get(media_url)
+    assert response.status_code == 200 and body(response) == CONTENT, (
+        'Убедитесь, что загруженные файлы отдаются при DEBUG = False.'
+    )
+    assert response['ETag'] == f'"{sha256(CONTENT).hexdigest()}"'
+    assert 'immutable' in response['Cache-Control']
+    assert response['Content-Type'] == 'image/png'
+    assert client.get(
+        media_url, HTTP_IF_NONE_MATCH=response['ETag']
+    ).status_code == 304
+
+
+@pytest.mark.parametrize(
+    'header, status, expected',
+    [
+        ('bytes=0-99', 206, CONTENT[:100]),
+        ('bytes=100-', 206, CONTENT[100:]),
+        ('bytes=-10', 206, CONTENT[-10:]),
+        ('bytes=0-1,5-6', 200, CONTENT),
+        (f'bytes={len(CONTENT)}-', 416, b''),
+    ],
+    ids=('head', 'tail', 'suffix', 'multiple', 'unsatisfiable'),
+)
+def test_range_requests(client, media_url, header, status, expected):
+    response = client.get(media_url, HTTP_RANGE=header)
+    assert response.status_code == status, (
+        f'Убедитесь, что запрос с Range: {header} возвращает {status}.'
+    )
+    content = body(response) if response.streaming else response.content
+    assert content == expected
+
+
+def test_if_range_mismatch_returns_whole_file(client, media_url):
+    response = client.get(
+        media_url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"другой"'
+    )
+    assert response.status_code == 200 and body(response) == CONTENT
+
+
+@pytest.mark.parametrize(
+    'mode, header', [
+        ('x-accel-redirect', 'X-Accel-Redirect'),
+        ('x-sendfile', 'X-Sendfile'),
+    ],
+)
+def test_proxy_modes(client, settings, media_url, mode, header):
+    settings.MEDIA_SERVE_MODE = mode
+    response = client.get(media_url)
+    assert response.status_code == 200 and not response.content
+    assert response[header].endswith(media_url.removeprefix('/media/')), (
+        f'Убедитесь, что в режиме {mode} отдача файла передаётся'
+        ' фронтенд-серверу.'
+    )
+
+
+def test_hidden_files_are_not_served(client, media_root):
+    temp_dir = media_root / 'posts_images' / '.incoming'
+    temp_dir.mkdir(parents=True)
+    (temp_dir / 'upload-x').write_bytes(CONTENT)
+    response = client.get('/media/posts_images/.incoming/upload-x')
+    assert response.status_code == 404, (
+        'Убедитесь, что незаконченные загрузки не отдаются.'
+    )
+
+
+def test_missing_and_outside_files(client):
+    assert client.get('/media/posts_images/missing.png').status_code == 404
+    assert client.get('/media/../manage.py').status_code == 404
@@ -0,0 +1,165 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from blog.paginators import encode_cursor
+from blog.views import IndexListView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары публикаций с одинаковым временем проверяют разбор ничьих по id.
+    pub_dates = (now - timedelta(hours=1 + i // 2) for i in range(25))
+    return mixer.cycle(25).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+@pytest.fixture
+def cursor_index(monkeypatch):
+    monkeypatch.setattr(IndexListView, 'cursor_paginate', True)
+
+
+@pytest.mark.usefixtures('cursor_index')
+def test_cursor_pagination_walks_feed(client, many_posts):
+    expected = sorted(
+        many_posts, key=lambda post: (post.pub_date, post.pk), reverse=True
+    )
+    pages = []
+    url = '/'
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['page_obj']
+        pages.append(list(page))
+        url = f'/?after={page.next_cursor}' if page.has_next() else None
+
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5], (
+        'Убедитесь, что курсорная пагинация отдаёт страницы по'
+        f' {N_PER_PAGE} публикаций.'
+    )
+    assert sum(pages, []) == expected, (
+        'Убедитесь, что курсорная пагинация обходит ленту без пропусков и'
+        ' повторов в порядке «от новых к старым».'
+    )
+
+    previous = client.get(f'/?before={page.previous_cursor}')
+    assert list(previous.context['page_obj']) == pages[-2], (
+        'Убедитесь, что ссылка на предыдущую страницу возвращает'
+        ' предыдущую страницу ленты.'
+    )
+    assert 'Последняя' not in previous.content.decode('utf-8')
+
+
+@pytest.mark.usefixtures('cursor_index')
+def test_cursor_links_skip_missing_cursors(client, many_posts):
+    newest = max(post.pub_date for post in many_posts)
+    response = client.get(
+        f'/?before={encode_cursor(newest + timedelta(days=1), 0)}'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert 'None' not in response.content.decode('utf-8'), (
+        'Убедитесь, что ссылки курсорной пагинации выводятся, только если'
+        ' курсор есть.'
+    )
+
+
+@pytest.mark.usefixtures('cursor_index')
+def test_cursor_pagination_skips_count(
+        client, many_posts, django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(4) as captured:
+        client.get('/')
+    assert not any(
+        'COUNT(' in query['sql'] for query in captured.captured_queries
+    ), 'Курсорная пагинация не должна выполнять COUNT(*).'
+
+
+@pytest.mark.usefixtures('cursor_index')
+def test_cursor_pagination_invalid_token(client):
+    response = client.get('/?after=not-a-cursor')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def count_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+def test_cold_count_cache_estimates_pages(
+        client, many_posts, django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(4) as captured:
+        response = client.get('/')
+    paginator = response.context['paginator']
+    assert not count_queries(captured), (
+        'Убедитесь, что при пустом кэше лента не выполняет COUNT(*).'
+    )
+    assert paginator.count_is_estimate and paginator.num_pages == 2, (
+        'Убедитесь, что при пустом кэше paginator оценивает число страниц'
+        ' как «не меньше следующей».'
+    )
+    assert 'Последняя' not in response.content.decode('utf-8')
+
+
+def test_count_cache_is_warmed_and_invalidated(
+        client, many_posts, django_assert_max_num_queries
+):
+    client.get('/?page=3')
+    with django_assert_max_num_queries(4) as captured:
+        paginator = client.get('/').context['paginator']
+    assert not count_queries(captured)
+    assert not paginator.count_is_estimate and paginator.count == 25, (
+        'Убедитесь, что точное число публикаций ленты берётся из кэша.'
+    )
+
+    post = many_posts[0]
+    post.is_published = False
+    post.save()
+    paginator = client.get('/?page=3').context['paginator']
+    assert paginator.count == 24, (
+        'Убедитесь, что кэш числа публикаций сбрасывается при изменении'
+        ' публикации.'
+    )
+
+
+def render_paginator(num_pages):
+    paginator = Paginator(range(num_pages * N_PER_PAGE), N_PER_PAGE)
+    page = paginator.page(num_pages // 2)
+    return render_to_string('includes/paginator.html', {
+        'page_obj': page,
+        'page_range': paginator.get_elided_page_range(page.number),
+    })
+
+
+def test_paginator_render_size_is_constant():
+    links = {
+        render_paginator(num_pages).count('<li')
+        for num_pages in (100, 2_000, 100_000)
+    }
+    assert len(links) == 1, (
+        'Убедитесь, что число ссылок в пагинаторе не зависит от количества'
+        ' страниц.'
+    )
+
+
+def test_rendering_benchmark_command():
+    stdout = StringIO()
+    call_command('benchmark_rendering', 'paginator', stdout=stdout)
+    assert '100000 страниц' in stdout.getvalue()
@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.lookups import ModelLRUCache
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+
+def lookups(captured, table, column):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].count(f'FROM "{table}"') == 1
+        and f'"{table}"."{column}" =' in query['sql'].split('WHERE')[-1]
+    ]
+
+
+def get_with_queries(client, url, django_assert_max_num_queries):
+    with django_assert_max_num_queries(10) as captured:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return captured
+
+
+def test_profile_lookup_once(
+        user_client, user, django_assert_max_num_queries
+):
+    captured = get_with_queries(
+        user_client, f'/profile/{user.username}/',
+        django_assert_max_num_queries,
+    )
+    assert len(lookups(captured, 'auth_user', 'username')) == 1, (
+        'Убедитесь, что профиль пользователя запрашивается из базы данных'
+        ' один раз за запрос.'
+    )
+
+
+def test_category_lookup_once(
+        client, published_category, django_assert_max_num_queries
+):
+    captured = get_with_queries(
+        client, f'/category/{published_category.slug}/',
+        django_assert_max_num_queries,
+    )
+    assert len(lookups(captured, 'blog_category', 'slug')) == 1, (
+        'Убедитесь, что категория запрашивается из базы данных один раз за'
+        ' запрос.'
+    )
+
+
+def test_post_detail_lookup_once(
+        user_client, post_with_published_location,
+        django_assert_max_num_queries
+):
+    captured = get_with_queries(
+        user_client, f'/posts/{post_with_published_location.id}/',
+        django_assert_max_num_queries,
+    )
+    assert len(lookups(captured, 'blog_post', 'id')) == 1, (
+        'Убедитесь, что публикация запрашивается из базы данных один раз за'
+        ' запрос.'
+    )
+
+
+def test_post_detail_comments_query_count(
+        mixer, user_client, post_with_published_location,
+        django_assert_max_num_queries
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    user_client.get(url)
+    query_counts = []
+    for comments_count in (1, 5):
+        mixer.cycle(comments_count).blend(
+            'blog.Comment', post=post, author=mixer.blend('auth.User')
+        )
+        query_counts.append(len(get_with_queries(
+            user_client, url, django_assert_max_num_queries
+        )))
+    assert query_counts[0] == query_counts[1], (
+        'Убедитесь, что авторы комментариев на странице публикации'
+        ' загружаются одним запросом вместе с комментариями.'
+    )
+
+
+def test_feed_does_not_load_post_text(
+        client, post_with_published_location, django_assert_max_num_queries
+):
+    post = post_with_published_location
+    post.text = ' '.join(f'слово{i}' for i in range(50))
+    post.save()
+    with django_assert_max_num_queries(10) as captured:
+        content = client.get('/').content.decode('utf-8')
+    assert not any(
+        '"blog_post"."text"' in query['sql']
+        for query in captured.captured_queries
+    ), 'Убедитесь, что лента не загружает полный текст публикаций.'
+    assert 'слово0 слово1' in content and 'слово10' not in content, (
+        'Убедитесь, что в карточке публикации выводится анонс из первых'
+        ' 10 слов текста.'
+    )
+
+
+def test_categories_and_locations_come_from_lookup_cache(
+        user_client, post_with_published_location,
+        django_assert_max_num_queries
+):
+    post = post_with_published_location
+    urls = ('/', f'/category/{post.category.slug}/', f'/posts/{post.id}/')
+    for url in urls:
+        user_client.get(url)
+    for url in urls:
+        captured = get_with_queries(
+            user_client, url, django_assert_max_num_queries
+        )
+        assert not any(
+            table in query['sql']
+            for query in captured.captured_queries
+            for table in ('FROM "blog_category"', 'FROM "blog_location"',
+                          'JOIN "blog_location"')
+        ), (
+            f'Убедитесь, что страница {url} берёт категории и'
+            ' местоположения из кэша в памяти процесса.'
+        )
+
+    post.category.title = 'Новое название категории'
+    post.category.save()
+    post.location.name = 'Новое место'
+    post.location.save()
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    assert all(
+        name in content for name in ('Новое название категории', 'Новое место')
+    ), (
+        'Убедитесь, что кэш категорий и местоположений сбрасывается при их'
+        ' изменении.'
+    )
+
+
+def test_lookup_cache_is_bounded(mixer):
+    categories = mixer.cycle(5).blend('blog.Category')
+    lookup = ModelLRUCache(Category, 'slug', 'categories', maxsize=3)
+    found = lookup.get_many(category.slug for category in categories)
+    assert len(found) == 5 and len(lookup._items) == 3, (
+        'Убедитесь, что кэш категорий ограничен по размеру.'
+    )
@@ -0,0 +1,67 @@
+import re
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from blog.views import CategoryListView, IndexListView, ProfileListView
+
+pytestmark = [pytest.mark.django_db]
+
+FULL_SCAN = re.compile(r'\bSCAN blog_post\b(?! USING (COVERING )?INDEX)')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+
+def get_view_queryset(view_class, url, user, **kwargs):
+    request = RequestFactory().get(url)
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def assert_uses_index(queryset, page_name):
+    assert 'blog_category' not in str(queryset.query), (
+        f'Убедитесь, что запрос публикаций для {page_name} не соединяется'
+        ' с таблицей категорий.'
+    )
+    plan = queryset[:10].explain()
+    assert not FULL_SCAN.search(plan), (
+        f'Убедитесь, что запрос публикаций для {page_name} использует'
+        f' индекс, а не полный просмотр таблицы:\n{plan}'
+    )
+    assert not TEMP_SORT.search(plan), (
+        f'Убедитесь, что публикации для {page_name} сортируются по индексу,'
+        f' без временного B-дерева:\n{plan}'
+    )
+
+
+def test_index_query_plan(user):
+    assert_uses_index(
+        get_view_queryset(IndexListView, '/', user), 'главной страницы'
+    )
+
+
+def test_category_query_plan(user, published_category):
+    assert_uses_index(
+        get_view_queryset(
+            CategoryListView,
+            f'/category/{published_category.slug}/',
+            user,
+            category_slug=published_category.slug,
+        ),
+        'страницы категории',
+    )
+
+
+@pytest.mark.parametrize('is_owner', (True, False))
+def test_profile_query_plan(user, is_owner):
+    assert_uses_index(
+        get_view_queryset(
+            ProfileListView,
+            f'/profile/{user.username}/',
+            user if is_owner else AnonymousUser(),
+            username=user.username,
+        ),
+        'страницы пользователя',
+    )
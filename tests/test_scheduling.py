@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.management.commands import publish_scheduled
+from blog.scheduling import next_publication_time, publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def index_posts(client):
+    return list(client.get('/').context['page_obj'])
+
+
+def test_scheduled_post_is_published_by_worker(
+        client, scheduled_post, django_capture_on_commit_callbacks
+):
+    assert not scheduled_post.is_visible
+    assert scheduled_post not in index_posts(client), (
+        'Убедитесь, что отложенная публикация не видна до наступления'
+        ' времени публикации.'
+    )
+    assert next_publication_time() == scheduled_post.pub_date
+
+    assert publish_due_posts() == 0
+    with django_capture_on_commit_callbacks(execute=True):
+        assert publish_due_posts(
+            now=scheduled_post.pub_date + timedelta(seconds=1)
+        ) == 1
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_visible
+    assert scheduled_post in index_posts(client), (
+        'Убедитесь, что после публикации обработчиком отложенный пост'
+        ' появляется в ленте, а кэш ленты сбрасывается.'
+    )
+    assert next_publication_time() is None
+
+
+def test_publish_scheduled_command(scheduled_post):
+    scheduled_post.pub_date = timezone.now() - timedelta(seconds=1)
+    type(scheduled_post).objects.filter(pk=scheduled_post.pk).update(
+        pub_date=scheduled_post.pub_date
+    )
+    call_command('publish_scheduled', '--once')
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_visible
+
+
+class StopWorker(Exception):
+    pass
+
+
+def test_worker_does_not_skip_post_between_checks(
+        monkeypatch, scheduled_post
+):
+    start = scheduled_post.pub_date - timedelta(seconds=1)
+    ticks = iter(range(100))
+    monkeypatch.setattr(
+        timezone, 'now', lambda: start + timedelta(seconds=next(ticks))
+    )
+    delays = []
+
+    def sleep(delay):
+        delays.append(delay)
+        raise StopWorker
+
+    monkeypatch.setattr(publish_scheduled.time, 'sleep', sleep)
+    with pytest.raises(StopWorker):
+        call_command('publish_scheduled', interval=60)
+    assert delays == [0], (
+        'Убедитесь, что обработчик не пропускает запись, время которой'
+        ' наступило между проверкой и расчётом паузы.'
+    )
+
+
+def test_category_toggle_updates_visibility(
+        published_category, scheduled_post, post_with_published_location
+):
+    post = post_with_published_location
+    published_category.is_published = False
+    published_category.save()
+    post.refresh_from_db()
+    assert not post.is_visible, (
+        'Убедитесь, что публикации скрываются при снятии с публикации их'
+        ' категории.'
+    )
+    assert publish_due_posts(
+        now=scheduled_post.pub_date + timedelta(seconds=1)
+    ) == 0, (
+        'Убедитесь, что обработчик отложенных публикаций не показывает посты'
+        ' из неопубликованных категорий.'
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    post.refresh_from_db()
+    scheduled_post.refresh_from_db()
+    assert post.is_visible and not scheduled_post.is_visible, (
+        'Убедитесь, что при публикации категории видимыми становятся только'
+        ' опубликованные посты, время которых наступило.'
+    )
+
+    published_category.delete()
+    post.refresh_from_db()
+    assert not post.is_visible
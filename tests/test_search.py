@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.admin.sites import site
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category, published_location):
+    def blend(title, text, **kwargs):
+        return mixer.blend(
+            'blog.Post', title=title, text=text, author=user,
+            category=published_category, location=published_location,
+            **kwargs
+        )
+
+    return {
+        'title': blend('Кошки и собаки', 'Про домашних животных'),
+        'text': blend('Заметка', 'Здесь немного пишут про кошки'),
+        'many': blend('Кошки', 'Кошки, кошки и снова кошки'),
+        'hidden': blend('Кошки тайком', 'Черновик', is_published=False),
+        'other': blend('Погода', 'Солнечно'),
+    }
+
+
+def search(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что страница поиска по адресу /search/ отображается'
+        ' без ошибок.'
+    )
+    return list(response.context['page_obj'])
+
+
+def test_search_ranks_published_posts(client, searchable_posts):
+    found = search(client, 'кошки')
+    assert searchable_posts['hidden'] not in found, (
+        'Убедитесь, что поиск не показывает снятые с публикации посты.'
+    )
+    assert set(found) == {
+        searchable_posts['title'],
+        searchable_posts['text'],
+        searchable_posts['many'],
+    }, 'Убедитесь, что поиск находит посты по заголовку и тексту.'
+    assert found[0] == searchable_posts['many'], (
+        'Убедитесь, что результаты поиска отсортированы по релевантности.'
+    )
+    assert search(client, '') == []
+
+
+def test_search_matches_index_once(client, searchable_posts):
+    with CaptureQueriesContext(connection) as captured:
+        search(client, 'кошки')
+    assert all(
+        query['sql'].count('MATCH') <= 1
+        for query in captured.captured_queries
+    ), (
+        'Убедитесь, что поиск присоединяет полнотекстовый индекс один раз и'
+        ' не выполняет MATCH для каждой строки.'
+    )
+
+
+def test_search_index_follows_edits(client, searchable_posts):
+    post = searchable_posts['other']
+    post.text = 'Дождь и кошки'
+    post.save()
+    assert post in search(client, 'дождь')
+    post.delete()
+    assert search(client, 'дождь') == []
+
+
+def test_rebuild_search_index(client, searchable_posts):
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+    assert search(client, 'погода') == []
+    call_command('rebuild_search_index')
+    assert search(client, 'погода') == [searchable_posts['other']]
+
+
+def test_admin_search_uses_index(rf, admin_user, searchable_posts):
+    request = rf.get('/admin/blog/post/', {'q': 'снова'})
+    request.user = admin_user
+    found, _ = site._registry[Post].get_search_results(
+        request, Post.objects.all(), 'снова'
+    )
+    assert list(found) == [searchable_posts['many']]
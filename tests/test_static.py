@@ -0,0 +1,92 @@
+import gzip
+import re
+
+import pytest
+from django.core.management import call_command
+
+from blog.css import find_classes, purge_css
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return tmp_path
+
+
+def stylesheet_url(client):
+    content = client.get('/').content.decode('utf-8')
+    return re.search(r'<link rel="stylesheet" href="([^"]+)"', content)[1]
+
+
+def test_no_third_party_assets(client):
+    content = client.get('/').content.decode('utf-8')
+    assert not re.search(r'(href|src)="(https?:)?//', content), (
+        'Убедитесь, что страницы не загружают стили и скрипты со сторонних'
+        ' серверов.'
+    )
+    assert stylesheet_url(client) == '/static/css/blogicum.min.css'
+
+
+def test_collected_static_is_hashed_and_precompressed(
+        client, collected_static
+):
+    url = stylesheet_url(client)
+    assert re.fullmatch(
+        r'/static/css/blogicum\.min\.[0-9a-f]{12}\.css', url
+    ), (
+        'Убедитесь, что после collectstatic стили подключаются по имени с'
+        ' хэшем содержимого.'
+    )
+    path = collected_static / url.removeprefix('/static/')
+    with open(f'{path}.gz', 'rb') as file:
+        assert gzip.decompress(file.read()) == path.read_bytes(), (
+            'Убедитесь, что collectstatic создаёт сжатые копии .gz.'
+        )
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'].startswith('text/css')
+    assert 'immutable' in response['Cache-Control']
+    assert 'Accept-Encoding' in response['Vary']
+    assert b''.join(response.streaming_content) == path.with_name(
+        f'{path.name}.gz'
+    ).read_bytes()
+
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain
+    assert plain['ETag'] != response['ETag']
+
+
+def test_find_classes_in_templates():
+    assert find_classes(
+        '<a class="nav-link {% if active %} text-white {% endif %}">'
+        '<p class=\'card-text {{ extra }}\'>'
+    ) == {'nav-link', 'text-white', 'card-text'}
+
+
+def test_purge_css():
+    css = (
+        '@charset "UTF-8";/*! лицензия */body{margin:0}'
+        '.btn,.carousel{color:red}.btn:not(.active){opacity:1}'
+        '.card .carousel-item{top:0}'
+        '@media (min-width:576px){.carousel{left:0}.btn{left:1px}}'
+        '@media print{.carousel{display:none}}'
+    )
+    assert purge_css(css, {'btn', 'card'}) == (
+        '@charset "UTF-8";/*! лицензия */body{margin:0}.btn{color:red}'
+        '.btn:not(.active){opacity:1}'
+        '@media (min-width:576px){.btn{left:1px}}'
+    )
+    assert purge_css(css, {'btn'}, inline=True).startswith('body{')
+
+
+def test_purged_styles_are_up_to_date(client):
+    call_command('purge_css', check=True)
+    content = client.get('/').content.decode('utf-8')
+    assert '<style>' in content and '.navbar{' in content, (
+        'Убедитесь, что критические стили встроены в base.html.'
+    )
@@ -0,0 +1,99 @@
+import re
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="[^"]*"')
+
+
+def normalize(html):
+    return ' '.join(CSRF_RE.sub('', html).split())
+
+
+def get_page(client, settings, url, stream):
+    settings.BLOG_STREAM_LIST_PAGES = stream
+    cache.clear()
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming == stream, (
+        'Убедитесь, что потоковая отдача ленты включается настройкой'
+        ' BLOG_STREAM_LIST_PAGES.'
+    )
+    if stream:
+        return b''.join(response.streaming_content).decode('utf-8')
+    return response.content.decode('utf-8')
+
+
+@pytest.fixture
+def feed_urls(mixer, user, published_category):
+    mixer.cycle(12).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+
+
+def test_streamed_page_matches_buffered(user_client, settings, feed_urls):
+    for url in feed_urls:
+        buffered = get_page(user_client, settings, url, stream=False)
+        streamed = get_page(user_client, settings, url, stream=True)
+        assert normalize(streamed) == normalize(buffered), (
+            f'Убедитесь, что потоковая страница {url} совпадает с обычной.'
+        )
+        assert len(BeautifulSoup(streamed, 'html.parser').find_all(
+            'article'
+        )) == 10
+
+
+def test_only_first_page_is_streamed(client, settings, feed_urls):
+    settings.BLOG_STREAM_LIST_PAGES = True
+    for query in ('?page=2', '?page=99'):
+        response = client.get(f'/{query}')
+        assert not response.streaming, (
+            'Убедитесь, что потоком отдаётся только первая страница ленты.'
+        )
+    assert client.get('/?page=99').status_code == HTTPStatus.NOT_FOUND
+    assert client.get('/category/missing/').status_code == (
+        HTTPStatus.NOT_FOUND
+    ), 'Убедитесь, что для несуществующей категории возвращается 404.'
+
+
+def count_queries(client, settings, url, stream):
+    settings.BLOG_STREAM_LIST_PAGES = stream
+    cache.clear()
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+        if stream:
+            b''.join(response.streaming_content)
+    return len(captured)
+
+
+def test_streaming_runs_same_queries(user_client, settings, feed_urls):
+    for url in feed_urls:
+        assert count_queries(
+            user_client, settings, url, stream=True
+        ) == count_queries(user_client, settings, url, stream=False), (
+            f'Убедитесь, что потоковая страница {url} выполняет те же'
+            ' запросы, что и обычная.'
+        )
+
+
+def test_streaming_benchmark_command(settings, feed_urls):
+    stdout = StringIO()
+    call_command(
+        'benchmark_rendering', 'streaming', host='testserver',
+        stdout=stdout,
+    )
+    assert 'потоком' in stdout.getvalue()
+    assert not settings.BLOG_STREAM_LIST_PAGES